@@ -0,0 +1,127 @@
+"""Проекции моделей для API: имя поля в ответе → поле запроса.
+
+Объекты читаются через values_list только по выбранным полям,
+без сборки экземпляров моделей и без лишних колонок и соединений.
+"""
+from django.core.files.storage import default_storage
+from django.core.paginator import InvalidPage
+
+from posts.utils import decode_cursor, encode_cursor, keyset_condition
+
+
+class ApiError(Exception):
+    def __init__(self, detail, status=400):
+        super().__init__(detail)
+        self.detail = detail
+        self.status = status
+
+
+def image_url(name):
+    return default_storage.url(name) if name else None
+
+
+class Projection:
+    def __init__(self, fields, default, converters=None):
+        self.fields = fields
+        self.default = default
+        self.converters = converters or {}
+
+    def select(self, request):
+        """Поля из ?fields=id,text или поля по умолчанию."""
+        requested = request.GET.get('fields')
+        if not requested:
+            return self.default
+        names = tuple(dict.fromkeys(
+            name.strip() for name in requested.split(',') if name.strip()
+        ))
+        unknown = [name for name in names if name not in self.fields]
+        if unknown or not names:
+            raise ApiError(
+                'Неизвестные поля: {}. Доступны: {}'.format(
+                    ', '.join(unknown) or '—', ', '.join(self.fields)
+                )
+            )
+        return names
+
+    def rows(self, queryset, names, extra=(), limit=None):
+        """Словари с полями names; поля extra читаются вместе с ними
+        и отдаются отдельно, в словарь не попадают."""
+        lookups = [self.fields[name] for name in names]
+        rows = queryset.values_list(*lookups, *extra)
+        if limit is not None:
+            rows = rows[:limit]
+        for row in rows:
+            item = dict(zip(names, row))
+            for name, convert in self.converters.items():
+                if name in item:
+                    item[name] = convert(item[name])
+            yield item, row[len(names):]
+
+
+POST = Projection(
+    fields={
+        'id': 'id',
+        'text': 'text',
+        'pub_date': 'pub_date',
+        'edited': 'edited',
+        'author': 'author__username',
+        'group': 'group__slug',
+        'image': 'image',
+    },
+    default=('id', 'text', 'pub_date', 'author', 'group'),
+    converters={'image': image_url},
+)
+
+GROUP = Projection(
+    fields={
+        'id': 'id',
+        'slug': 'slug',
+        'title': 'title',
+        'description': 'description',
+    },
+    default=('slug', 'title', 'description'),
+)
+
+AUTHOR = Projection(
+    fields={
+        'username': 'username',
+        'first_name': 'first_name',
+        'last_name': 'last_name',
+    },
+    default=('username', 'first_name', 'last_name'),
+)
+
+
+def parse_limit(request, default, maximum):
+    value = request.GET.get('limit')
+    if value is None:
+        return default
+    try:
+        limit = int(value)
+    except ValueError:
+        limit = 0
+    if not 1 <= limit <= maximum:
+        raise ApiError(f'limit должен быть от 1 до {maximum}')
+    return limit
+
+
+def cursor_page(queryset, projection, request, default, maximum,
+                key=('pub_date', 'id')):
+    """Страница от новых к старым после ?after= и курсор следующей.
+    Глубина не влияет на стоимость: условие по ключу и LIMIT."""
+    names = projection.select(request)
+    limit = parse_limit(request, default, maximum)
+    after = request.GET.get('after')
+    if after:
+        try:
+            bound = decode_cursor(after)
+        except InvalidPage:
+            raise ApiError('Некорректный курсор')
+        queryset = queryset.filter(keyset_condition(key, *bound))
+    queryset = queryset.order_by(*(f'-{field}' for field in key))
+    rows = list(projection.rows(queryset, names, key, limit + 1))
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(*rows[-1][1])
+    return [item for item, _ in rows], next_cursor
@@ -0,0 +1,170 @@
+from datetime import timedelta
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.models import Group, Post
+from posts.utils import encode_cursor
+
+User = get_user_model()
+
+
+@override_settings(API_PAGE_SIZE=5, API_MAX_PAGE_SIZE=10)
+class ApiTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username='author', first_name='Лев'
+        )
+        cls.other = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        Post.objects.bulk_create(
+            Post(
+                author=cls.author if num % 2 else cls.other,
+                group=cls.group if num % 3 == 0 else None,
+                text=f'Пост {num}',
+            )
+            for num in range(12)
+        )
+        # Одинаковые даты: порядок и курсор держатся на id.
+        Post.objects.update(pub_date=timezone.now() - timedelta(days=1))
+        cls.post = Post.objects.order_by('-id').first()
+
+    def walk(self, url, **params):
+        """Все страницы списка по ссылкам next."""
+        items = []
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, HTTPStatus.OK)
+            data = response.json()
+            items.extend(data['results'])
+            if data['next'] is None:
+                return items
+            response = self.client.get(data['next'])
+
+    def test_post_lists_walk_all_posts_once(self):
+        lists = {
+            reverse('api:posts'): Post.objects.all(),
+            reverse('api:group_posts', args=(self.group.slug,)):
+                Post.objects.filter(group=self.group),
+            reverse('api:author_posts', args=(self.author.username,)):
+                Post.objects.filter(author=self.author),
+        }
+        for url, queryset in lists.items():
+            with self.subTest(url=url):
+                items = self.walk(url)
+                self.assertEqual(
+                    [item['id'] for item in items],
+                    list(queryset.order_by('-pub_date', '-id').values_list(
+                        'id', flat=True
+                    )),
+                )
+
+    def test_fields_selection(self):
+        data = self.client.get(
+            reverse('api:posts'), {'fields': 'id,author', 'limit': 2}
+        ).json()
+
+        self.assertEqual(
+            data['results'][0],
+            {'id': self.post.id, 'author': self.post.author.username},
+        )
+        self.assertIn('fields=id%2Cauthor', data['next'])
+        self.assertEqual(len(self.walk(data['next'])), 10)
+
+    def test_list_query_budget(self):
+        self.client.get(reverse('api:posts'))
+
+        # Состояние ленты, счётчик и сами посты.
+        with self.assertNumQueries(3):
+            response = self.client.get(reverse('api:posts'))
+
+        self.assertEqual(response.json()['count'], 12)
+        self.assertEqual(len(response.json()['results']), 5)
+
+    def test_post_detail(self):
+        data = self.client.get(
+            reverse('api:post', args=(self.post.id,)),
+            {'fields': 'text,edited,image'},
+        ).json()
+
+        self.assertEqual(set(data), {'text', 'edited', 'image'})
+        self.assertEqual(data['text'], self.post.text)
+        self.assertIsNone(data['image'])
+
+    def test_groups_and_author(self):
+        groups = self.client.get(reverse('api:groups')).json()['results']
+        author = self.client.get(
+            reverse('api:author', args=(self.author.username,))
+        ).json()
+
+        self.assertEqual(groups, [
+            {'slug': 'group', 'title': 'Группа', 'description': 'Описание'}
+        ])
+        self.assertEqual(author['first_name'], 'Лев')
+        self.assertEqual(author['posts_count'], 6)
+
+    def test_conditional_get(self):
+        url = reverse('api:posts')
+        self.client.get(url)
+        etag = self.client.get(url)['ETag']
+
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+        Post.objects.create(author=self.author, text='Новый')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.json()['results'][0]['text'], 'Новый')
+
+    def test_post_etag_follows_author_and_group(self):
+        post = Post.objects.filter(group=self.group).first()
+        url = reverse('api:post', args=(post.id,))
+        changes = {
+            'author': (User.objects.get(pk=post.author_id), 'username',
+                       'renamed'),
+            'group': (Group.objects.get(pk=post.group_id), 'slug',
+                      'renamed'),
+        }
+        for field, (obj, attr, value) in changes.items():
+            with self.subTest(field=field):
+                self.client.get(url)
+                etag = self.client.get(url)['ETag']
+
+                setattr(obj, attr, value)
+                obj.save()
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertEqual(response.json()[field], value)
+
+    def test_errors(self):
+        errors = {
+            (reverse('api:posts'), 'fields=id,secret'): HTTPStatus.BAD_REQUEST,
+            (reverse('api:posts'), 'limit=11'): HTTPStatus.BAD_REQUEST,
+            (reverse('api:posts'), 'limit=x'): HTTPStatus.BAD_REQUEST,
+            (reverse('api:posts'), 'after=broken'): HTTPStatus.BAD_REQUEST,
+            (reverse('api:posts'), 'after=' + encode_cursor(
+                timezone.now(), 10 ** 20
+            )): HTTPStatus.BAD_REQUEST,
+            (reverse('api:post', args=(0,)), ''): HTTPStatus.NOT_FOUND,
+            (reverse('api:group_posts', args=('no',)), ''):
+                HTTPStatus.NOT_FOUND,
+            (reverse('api:author', args=('no',)), ''): HTTPStatus.NOT_FOUND,
+        }
+        for (url, query), status in errors.items():
+            with self.subTest(url=url, query=query):
+                response = self.client.get(f'{url}?{query}')
+                self.assertEqual(response.status_code, status)
+                self.assertIn('detail', response.json())
+
+    def test_read_only(self):
+        response = self.client.post(reverse('api:posts'))
+
+        self.assertEqual(
+            response.status_code, HTTPStatus.METHOD_NOT_ALLOWED
+        )
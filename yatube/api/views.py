@@ -0,0 +1,118 @@
+from functools import wraps
+
+from django.conf import settings
+from django.http import JsonResponse
+from django.urls import reverse
+from django.utils.http import urlencode
+from django.views.decorators.http import require_safe
+
+from posts.conditional import (
+    author_feed_state, conditional_page, group_feed_state, index_feed_state,
+    post_state
+)
+from posts.models import Counter, Group, Post, User
+
+from .projections import AUTHOR, GROUP, POST, ApiError, cursor_page
+
+
+def api_view(view):
+    """Только GET и HEAD; ошибки API отдаются JSON с полем detail."""
+    @require_safe
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return JsonResponse(view(request, *args, **kwargs))
+        except ApiError as error:
+            return JsonResponse(
+                {'detail': error.detail}, status=error.status
+            )
+    return wrapper
+
+
+def get_id(queryset, message):
+    object_id = queryset.values_list('id', flat=True).first()
+    if object_id is None:
+        raise ApiError(message, status=404)
+    return object_id
+
+
+def post_list(request, queryset, scope, object_id=0):
+    """Страница постов; count берётся из счётчика ленты, он же
+    нужен для ETag."""
+    count = Counter.objects.value(scope, object_id)
+    results, next_cursor = cursor_page(
+        queryset,
+        POST,
+        request,
+        settings.API_PAGE_SIZE,
+        settings.API_MAX_PAGE_SIZE,
+    )
+    next_url = None
+    if next_cursor:
+        query = request.GET.copy()
+        query['after'] = next_cursor
+        next_url = f'{request.path}?{urlencode(query, doseq=True)}'
+    return {'count': count, 'results': results, 'next': next_url}
+
+
+@conditional_page(index_feed_state, per_user=False)
+@api_view
+def posts(request):
+    return post_list(request, Post.objects.all(), Counter.TOTAL)
+
+
+@conditional_page(post_state, per_user=False)
+@api_view
+def post(request, post_id):
+    names = POST.select(request)
+    for item, _ in POST.rows(Post.objects.filter(pk=post_id), names):
+        return item
+    raise ApiError('Пост не найден', status=404)
+
+
+@api_view
+def groups(request):
+    names = GROUP.select(request)
+    rows = GROUP.rows(Group.objects.order_by('slug'), names)
+    return {'results': [item for item, _ in rows]}
+
+
+@conditional_page(group_feed_state, per_user=False)
+@api_view
+def group_posts(request, slug):
+    group_id = get_id(Group.objects.filter(slug=slug), 'Группа не найдена')
+    return post_list(
+        request,
+        Post.objects.filter(group_id=group_id),
+        Counter.GROUP,
+        group_id,
+    )
+
+
+@conditional_page(author_feed_state, per_user=False)
+@api_view
+def author(request, username):
+    names = AUTHOR.select(request)
+    for item, (author_id,) in AUTHOR.rows(
+        User.objects.filter(username=username), names, extra=('id',)
+    ):
+        item['posts_count'] = Counter.objects.value(
+            Counter.AUTHOR, author_id
+        )
+        item['posts_url'] = reverse('api:author_posts', args=(username,))
+        return item
+    raise ApiError('Автор не найден', status=404)
+
+
+@conditional_page(author_feed_state, per_user=False)
+@api_view
+def author_posts(request, username):
+    author_id = get_id(
+        User.objects.filter(username=username), 'Автор не найден'
+    )
+    return post_list(
+        request,
+        Post.objects.filter(author_id=author_id),
+        Counter.AUTHOR,
+        author_id,
+    )
@@ -0,0 +1,10 @@
+from django.contrib import admin
+
+from .models import Task
+
+
+@admin.register(Task)
+class TaskAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'name', 'args', 'attempts', 'run_at', 'failed')
+    list_filter = ('failed', 'name')
+    search_fields = ('name', 'args')
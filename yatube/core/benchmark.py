@@ -0,0 +1,173 @@
+"""Генератор нагрузки на WSGI-приложение проекта для бенчмарков."""
+import os
+import statistics
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+from socketserver import ThreadingMixIn
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode
+from urllib.request import HTTPRedirectHandler, Request, build_opener
+from wsgiref.simple_server import WSGIRequestHandler, WSGIServer, make_server
+
+from django.core.wsgi import get_wsgi_application
+from django.db import connection
+from django.test.utils import (
+    CaptureQueriesContext, setup_databases, teardown_databases
+)
+
+
+class NoRedirectHandler(HTTPRedirectHandler):
+    """Редирект считается ответом, а не поводом для второго запроса:
+    иначе время POST включало бы страницу, на которую он ведёт."""
+
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+class ThreadingWSGIServer(ThreadingMixIn, WSGIServer):
+    daemon_threads = True
+    # С очередью по умолчанию (5) лишние соединения отбрасываются,
+    # клиент повторяет их через секунду, и p95 меряет таймаут TCP.
+    request_queue_size = 128
+
+
+class QuietWSGIRequestHandler(WSGIRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class LocalServer:
+    """WSGI-сервер проекта на свободном порту в фоновом потоке.
+
+        with LocalServer() as server:
+            run_load(server.url('/'), requests=100, concurrency=4)
+    """
+
+    def __init__(self, application=None):
+        self.application = application or get_wsgi_application()
+
+    def __enter__(self):
+        self.httpd = make_server(
+            '127.0.0.1',
+            0,
+            self.application,
+            server_class=ThreadingWSGIServer,
+            handler_class=QuietWSGIRequestHandler,
+        )
+        self.thread = threading.Thread(
+            target=self.httpd.serve_forever,
+            daemon=True
+        )
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self.thread.join()
+
+    def url(self, path):
+        return f'http://127.0.0.1:{self.httpd.server_port}{path}'
+
+
+def percentile(values, share):
+    """Перцентиль отсортированного списка, share от 0 до 1."""
+    if not values:
+        return 0
+    index = min(len(values) - 1, int(round(share * (len(values) - 1))))
+    return values[index]
+
+
+def summarize(latencies, seconds, errors=0):
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'seconds': round(seconds, 3),
+        'rps': round(len(latencies) / seconds, 1) if seconds else 0,
+        'p50_ms': round(percentile(latencies, 0.50) * 1000, 2),
+        'p95_ms': round(percentile(latencies, 0.95) * 1000, 2),
+        'p99_ms': round(percentile(latencies, 0.99) * 1000, 2),
+    }
+
+
+def run_load(url, requests=200, concurrency=4, data=None, headers=None):
+    """Отправляет requests запросов на url из concurrency потоков
+    и возвращает пропускную способность и перцентили задержки.
+    С data запросы идут методом POST, редиректы не выполняются."""
+    latencies = []
+    errors = []
+    lock = threading.Lock()
+    opener = build_opener(NoRedirectHandler)
+    body = urlencode(data).encode() if data is not None else None
+
+    def fetch(_):
+        request = Request(url, data=body, headers=headers or {})
+        start = time.perf_counter()
+        try:
+            with opener.open(request) as response:
+                response.read()
+        except HTTPError as error:
+            error.close()
+            if error.code >= 400:
+                with lock:
+                    errors.append(url)
+                return
+        except (URLError, OSError):
+            with lock:
+                errors.append(url)
+            return
+        with lock:
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(fetch, range(requests)))
+    return summarize(latencies, time.perf_counter() - start, len(errors))
+
+
+def run_client(client, path, requests=100, data=None):
+    """Гоняет запросы через тестовый клиент Django в этом потоке.
+    Кроме задержек считает SQL-запросы на каждый ответ."""
+    latencies = []
+    queries = []
+    errors = 0
+    start = time.perf_counter()
+    for _ in range(requests):
+        with CaptureQueriesContext(connection) as captured:
+            started = time.perf_counter()
+            if data is None:
+                response = client.get(path)
+            else:
+                response = client.post(path, data)
+            elapsed = time.perf_counter() - started
+        if response.status_code >= 400:
+            errors += 1
+            continue
+        latencies.append(elapsed)
+        queries.append(len(captured))
+    result = summarize(latencies, time.perf_counter() - start, errors)
+    result['queries_mean'] = (
+        round(statistics.mean(queries), 2) if queries else 0
+    )
+    result['queries_max'] = max(queries, default=0)
+    return result
+
+
+@contextmanager
+def bench_database():
+    """Отдельная база на время прогона, как у тестов, но в файле:
+    WSGI-сервер работает с ней из своих потоков."""
+    with tempfile.TemporaryDirectory() as directory:
+        if connection.vendor == 'sqlite':
+            connection.settings_dict['TEST']['NAME'] = os.path.join(
+                directory, 'bench.sqlite3'
+            )
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            yield
+        finally:
+            teardown_databases(old_config, verbosity=0)
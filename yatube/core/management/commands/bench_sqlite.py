@@ -0,0 +1,186 @@
+import json
+import threading
+import time
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.db import DatabaseError, connection
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.benchmark import LocalServer, bench_database, run_load
+from posts.management.commands.import_posts import Command as ImportPosts
+from posts.models import Post
+
+User = get_user_model()
+
+NO_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+}
+# Умолчания SQLite: журнал отката, fsync на каждой транзакции,
+# 2 МБ кэша страниц, без mmap.
+DEFAULT_PRAGMAS = {
+    'journal_mode': 'DELETE',
+    'synchronous': 'FULL',
+    'cache_size': -2000,
+    'mmap_size': 0,
+}
+
+
+class Writers:
+    """Потоки, которые создают посты с заданной общей частотой,
+    пока их не остановят. Частота ограничена, иначе писатели
+    занимают GIL и читатели упираются в Python, а не в базу."""
+
+    def __init__(self, count, rate, author):
+        self.count = count
+        self.interval = count / rate
+        self.author = author
+        self.stop = threading.Event()
+        self.lock = threading.Lock()
+        self.created = 0
+        self.errors = 0
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        self.threads = [
+            threading.Thread(target=self.write, daemon=True)
+            for _ in range(self.count)
+        ]
+        for thread in self.threads:
+            thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop.set()
+        for thread in self.threads:
+            thread.join()
+        self.seconds = time.perf_counter() - self.started
+
+    def write(self):
+        next_at = time.perf_counter()
+        try:
+            while True:
+                next_at += self.interval
+                delay = max(0, next_at - time.perf_counter())
+                if self.stop.wait(delay):
+                    break
+                try:
+                    Post.objects.create(
+                        author=self.author, text='Пост под нагрузкой'
+                    )
+                except DatabaseError:
+                    with self.lock:
+                        self.errors += 1
+                    continue
+                with self.lock:
+                    self.created += 1
+        finally:
+            connection.close()
+
+    def summary(self):
+        return {
+            'created': self.created,
+            'errors': self.errors,
+            'per_second': round(self.created / self.seconds, 1),
+        }
+
+
+class Command(BaseCommand):
+    help = (
+        'Читает страницу через WSGI-сервер, пока другие потоки '
+        'непрерывно создают посты. Сравнивает умолчания SQLite '
+        'с SQLITE_PRAGMAS из настроек.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            help='По умолчанию список постов API: он упирается в базу, '
+                 'а не в рендер шаблонов'
+        )
+        parser.add_argument('--posts', type=int, default=10_000)
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument('--readers', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument(
+            '--write-rate', type=float, default=20,
+            help='Постов в секунду от всех писателей вместе'
+        )
+        parser.add_argument(
+            '--json', action='store_true', help='Вывести результат в JSON'
+        )
+
+    def handle(self, *args, **options):
+        modes = {
+            'default': DEFAULT_PRAGMAS,
+            'tuned': settings.SQLITE_PRAGMAS,
+        }
+        results = {}
+        for name, pragmas in modes.items():
+            # Кэш выключен, чтобы читатели каждый раз шли в базу.
+            with override_settings(SQLITE_PRAGMAS=pragmas, CACHES=NO_CACHE):
+                with bench_database():
+                    results[name] = self.measure(options)
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for name, result in results.items():
+            reads, writes = result['reads'], result['writes']
+            self.stdout.write(
+                f'{name} ({result["journal_mode"]}): '
+                f'чтение без записи {result["idle_reads"]["rps"]} '
+                f'запросов/с, под записью {reads["rps"]} запросов/с, '
+                f'p50/p95/p99 {reads["p50_ms"]}/{reads["p95_ms"]}/'
+                f'{reads["p99_ms"]} мс, ошибок {reads["errors"]}; '
+                f'запись {writes["per_second"]} постов/с, '
+                f'ошибок {writes["errors"]}'
+            )
+
+    def measure(self, options):
+        author = self.seed(options)
+        # Загрузка включает WAL в файле базы. Режим журнала можно
+        # сменить, только пока соединение с базой одно.
+        connection.close()
+        with connection.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            journal_mode, = cursor.fetchone()
+        with LocalServer() as server:
+            url = server.url(options['path'] or reverse('api:posts'))
+            load = {
+                'requests': options['requests'],
+                'concurrency': options['readers'],
+            }
+            run_load(url, requests=options['readers'])
+            idle = run_load(url, **load)
+            with Writers(
+                options['writers'], options['write_rate'], author
+            ) as writers:
+                reads = run_load(url, **load)
+        return {
+            'journal_mode': journal_mode,
+            'idle_reads': idle,
+            'reads': reads,
+            'writes': writers.summary(),
+        }
+
+    @staticmethod
+    def seed(options):
+        started = timezone.now() - timedelta(minutes=options['posts'])
+        lines = (
+            json.dumps({
+                'text': f'Пост номер {num}',
+                'author': f'author{num % 100}',
+                'group': f'group{num % 10}',
+                'pub_date': (started + timedelta(minutes=num)).isoformat(),
+            }) + '\n'
+            for num in range(options['posts'])
+        )
+        ImportPosts(stdout=StringIO()).load(lines, 'jsonl', 20_000)
+        return User.objects.get(username='author0')
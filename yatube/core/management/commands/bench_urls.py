@@ -0,0 +1,270 @@
+import json
+import os
+import subprocess
+from datetime import timedelta
+from io import StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+from django.test.utils import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.benchmark import (
+    LocalServer, bench_database, run_client, run_load
+)
+from posts.management.commands.import_posts import Command as ImportPosts
+from posts.models import Comment, Post
+
+User = get_user_model()
+
+BENCH_CACHES = {
+    'locmem': 'django.core.cache.backends.locmem.LocMemCache',
+    'dummy': 'django.core.cache.backends.dummy.DummyCache',
+}
+# Метрики, по которым сравниваются прогоны: рост задержки больше
+# порога или рост числа запросов к базе считается регрессией.
+LATENCY_METRICS = (('client', 'p95_ms'), ('wsgi', 'p95_ms'))
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ('git', 'rev-parse', 'HEAD'),
+            cwd=settings.BASE_DIR,
+            capture_output=True,
+            check=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет отдельную базу заданным объёмом данных и измеряет '
+        'страницы постов через тестовый клиент и через WSGI-сервер '
+        'с параллельными клиентами. Результат сохраняется в JSON, '
+        'который можно сравнить с прогоном другого коммита.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=10_000)
+        parser.add_argument('--authors', type=int, default=100)
+        parser.add_argument('--groups', type=int, default=10)
+        parser.add_argument('--comments', type=int, default=1_000)
+        parser.add_argument('--requests', type=int, default=200)
+        parser.add_argument('--concurrency', type=int, default=8)
+        parser.add_argument(
+            '--cache', choices=tuple(BENCH_CACHES), default='locmem'
+        )
+        parser.add_argument(
+            '--only', nargs='+', metavar='NAME',
+            help='Измерить только эти сценарии'
+        )
+        parser.add_argument(
+            '--output',
+            help='Файл результата; по умолчанию benchmarks/<коммит>.json'
+        )
+        parser.add_argument(
+            '--compare', metavar='JSON',
+            help='Сравнить с результатом прошлого прогона'
+        )
+        parser.add_argument('--threshold', type=float, default=0.2)
+
+    def handle(self, *args, **options):
+        caches = {'default': {'BACKEND': BENCH_CACHES[options['cache']]}}
+        with override_settings(CACHES=caches), bench_database():
+            self.seed(options)
+            results = {
+                name: self.measure(path, data, login, options)
+                for name, path, data, login in self.scenarios(options)
+            }
+        report = {
+            'commit': git_commit(),
+            'created': timezone.now().isoformat(),
+            'options': {
+                key: options[key] for key in (
+                    'posts', 'authors', 'groups', 'comments',
+                    'requests', 'concurrency', 'cache',
+                )
+            },
+            'results': results,
+        }
+        path = options['output'] or os.path.join(
+            settings.BASE_DIR, 'benchmarks', f'{report["commit"]}.json'
+        )
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as output:
+            json.dump(report, output, ensure_ascii=False, indent=2)
+        self.print_results(results)
+        self.stdout.write(f'Результат: {path}')
+        if options['compare']:
+            self.compare(options['compare'], results, options['threshold'])
+
+    def seed(self, options):
+        started = timezone.now() - timedelta(minutes=options['posts'])
+        groups = options['groups']
+        lines = (
+            json.dumps({
+                'text': f'Пост номер {num} для проверки скорости страниц',
+                'author': f'author{num % options["authors"]}',
+                'group': f'group{num % groups}' if groups else None,
+                'pub_date': (started + timedelta(minutes=num)).isoformat(),
+            }) + '\n'
+            for num in range(options['posts'])
+        )
+        ImportPosts(stdout=StringIO()).load(lines, 'jsonl', 20_000)
+        self.user = User.objects.create_user(username='bench')
+        self.post = Post.objects.order_by('-pub_date', '-id').first()
+        Comment.objects.bulk_create(
+            (
+                Comment(author=self.user, post=self.post, text=f'C{num}')
+                for num in range(options['comments'])
+            ),
+            batch_size=500
+        )
+        call_command('rebuild_counters', stdout=StringIO())
+
+    def scenarios(self, options):
+        create = reverse('posts:post_create')
+        scenarios = (
+            ('index', reverse('posts:index'), None, False),
+            (
+                'group_posts',
+                reverse('posts:group_posts', args=('group0',)),
+                None,
+                False,
+            ),
+            (
+                'profile',
+                reverse('posts:profile', args=('author0',)),
+                None,
+                False,
+            ),
+            (
+                'post_detail',
+                reverse('posts:post_detail', args=(self.post.pk,)),
+                None,
+                False,
+            ),
+            ('api_posts', reverse('api:posts'), None, False),
+            (
+                'api_group_posts',
+                reverse('api:group_posts', args=('group0',)),
+                None,
+                False,
+            ),
+            (
+                'api_author_posts',
+                reverse('api:author_posts', args=('author0',)),
+                None,
+                False,
+            ),
+            (
+                'api_post',
+                reverse('api:post', args=(self.post.pk,)),
+                None,
+                False,
+            ),
+            ('post_create', create, None, True),
+            # Последним: каждый запрос добавляет пост.
+            ('post_create_submit', create, {'text': 'Бенчмарк'}, True),
+        )
+        if options['only']:
+            unknown = set(options['only']) - {item[0] for item in scenarios}
+            if unknown:
+                raise CommandError(f'Нет сценариев: {", ".join(unknown)}')
+            scenarios = [
+                item for item in scenarios if item[0] in options['only']
+            ]
+        if not options['groups']:
+            scenarios = [
+                item for item in scenarios
+                if item[0] not in ('group_posts', 'api_group_posts')
+            ]
+        return scenarios
+
+    def measure(self, path, data, login, options):
+        client = Client()
+        headers = {}
+        if login:
+            client.force_login(self.user)
+            headers, data = self.wsgi_credentials(client, data)
+        requests = options['requests']
+        # Прогрев: первые запросы заполняют кэши и не показательны.
+        run_client(client, path, requests=min(requests, 5), data=data)
+        result = {
+            'path': path,
+            'method': 'GET' if data is None else 'POST',
+            'client': run_client(client, path, requests, data),
+        }
+        with LocalServer() as server:
+            result['wsgi'] = run_load(
+                server.url(path),
+                requests=requests,
+                concurrency=options['concurrency'],
+                data=data,
+                headers=headers,
+            )
+        return result
+
+    @staticmethod
+    def wsgi_credentials(client, data):
+        """Cookie сессии и CSRF-токен, чтобы WSGI-запросы шли
+        от того же пользователя, что и запросы тестового клиента."""
+        response = client.get(reverse('posts:post_create'))
+        token = response.cookies[settings.CSRF_COOKIE_NAME].value
+        session = client.cookies[settings.SESSION_COOKIE_NAME].value
+        headers = {
+            'Cookie': (
+                f'{settings.SESSION_COOKIE_NAME}={session}; '
+                f'{settings.CSRF_COOKIE_NAME}={token}'
+            ),
+        }
+        if data is not None:
+            data = {**data, 'csrfmiddlewaretoken': token}
+        return headers, data
+
+    def print_results(self, results):
+        for name, result in results.items():
+            client = result['client']
+            wsgi = result['wsgi']
+            self.stdout.write(
+                f'{name}: клиент p50/p95/p99 {client["p50_ms"]}/'
+                f'{client["p95_ms"]}/{client["p99_ms"]} мс, '
+                f'запросов к БД {client["queries_mean"]} '
+                f'(макс. {client["queries_max"]}); '
+                f'WSGI {wsgi["rps"]} запросов/с, '
+                f'p95 {wsgi["p95_ms"]} мс, ошибок {wsgi["errors"]}'
+            )
+
+    def compare(self, baseline_path, results, threshold):
+        with open(baseline_path, encoding='utf-8') as baseline_file:
+            baseline = json.load(baseline_file)
+        self.stdout.write(f'Сравнение с {baseline["commit"]}:')
+        regressions = []
+        for name, result in results.items():
+            old = baseline['results'].get(name)
+            if old is None:
+                continue
+            for source, metric in LATENCY_METRICS:
+                before, after = old[source][metric], result[source][metric]
+                change = (after - before) / before if before else 0
+                line = f'  {name} {source} {metric}: {before} → {after}'
+                if change > threshold:
+                    regressions.append(line)
+                self.stdout.write(f'{line} ({change:+.0%})')
+            before = old['client']['queries_max']
+            after = result['client']['queries_max']
+            if after > before:
+                line = f'  {name} запросов к БД: {before} → {after}'
+                regressions.append(line)
+                self.stdout.write(line)
+        if regressions:
+            raise CommandError(
+                'Регрессии:\n' + '\n'.join(regressions)
+            )
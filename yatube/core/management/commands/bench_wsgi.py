@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.test.utils import override_settings
+
+from core.benchmark import LocalServer, run_load
+
+NO_CACHE = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
+}
+
+
+class Command(BaseCommand):
+    help = (
+        'Нагружает страницу через локальный WSGI-сервер и сравнивает '
+        'запросы в секунду без кэша и с кэшем из настроек. '
+        'Несколько значений --concurrency показывают, с какого числа '
+        'одновременных клиентов сервер перестаёт ускоряться.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--path', default='/')
+        parser.add_argument('--requests', type=int, default=500)
+        parser.add_argument(
+            '--concurrency', type=int, nargs='+', default=[8]
+        )
+
+    def handle(self, *args, **options):
+        runs = (
+            ('без кэша', override_settings(CACHES=NO_CACHE)),
+            ('с кэшем', override_settings()),
+        )
+        for title, cache_settings in runs:
+            with cache_settings, LocalServer() as server:
+                url = server.url(options['path'])
+                run_load(url, requests=max(options['concurrency']))
+                for concurrency in options['concurrency']:
+                    result = run_load(
+                        url,
+                        requests=options['requests'],
+                        concurrency=concurrency,
+                    )
+                    self.stdout.write(
+                        f'{title}, клиентов {concurrency}: '
+                        f'{result["rps"]} запросов/с, '
+                        f'p50 {result["p50_ms"]} мс, '
+                        f'p95 {result["p95_ms"]} мс, '
+                        f'ошибок {result["errors"]}'
+                    )
@@ -0,0 +1,61 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.test import Client
+
+from core import timing
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = (
+        'Запрашивает страницы через тестовый клиент и показывает, '
+        'сколько в среднем стоит рендер каждого шаблона, включая '
+        'подключённые через include и extends.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('paths', nargs='+', metavar='PATH')
+        parser.add_argument('--requests', type=int, default=20)
+        parser.add_argument(
+            '--user', help='Запрашивать страницы от имени пользователя'
+        )
+
+    def handle(self, *args, **options):
+        client = Client()
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f'Нет пользователя {options["user"]}')
+            client.force_login(user)
+        for path in options['paths']:
+            self.report(path, self.measure(client, path, options))
+
+    @staticmethod
+    def measure(client, path, options):
+        # Прогрев: первый рендер загружает и компилирует шаблоны.
+        client.get(path)
+        stats = timing.ViewStats()
+        for _ in range(options['requests']):
+            with timing.timed_request() as timer:
+                response = client.get(path)
+            if response.status_code >= 400:
+                raise CommandError(f'{path}: ответ {response.status_code}')
+            stats.add(timer.elapsed, timer)
+        return stats.as_dict()
+
+    def report(self, path, stats):
+        self.stdout.write(
+            f'{path}: ответ {stats["mean_ms"]} мс, '
+            f'шаблоны {stats["template_mean_ms"]} мс, '
+            f'SQL {stats["db_mean_ms"]} мс'
+        )
+        self.stdout.write(
+            f'  {"шаблон":<48} {"рендеров":>8} {"всего, мс":>10} '
+            f'{"своё, мс":>10}'
+        )
+        for name, row in stats['templates'].items():
+            self.stdout.write(
+                f'  {name:<48} {row["renders"]:>8} {row["mean_ms"]:>10} '
+                f'{row["self_mean_ms"]:>10}'
+            )
@@ -0,0 +1,45 @@
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from core import tasks
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет фоновые задачи из очереди core_task пачками. '
+        'Обработчиков можно запустить несколько: задачу получает '
+        'только один из них.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch', type=int, default=settings.TASK_BATCH_SIZE
+        )
+        parser.add_argument(
+            '--poll', type=float, default=settings.TASK_POLL_SECONDS,
+            help='Пауза в секундах, когда очередь пуста'
+        )
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Выполнить готовые задачи и выйти'
+        )
+
+    def handle(self, *args, **options):
+        worker = tasks.new_worker_id()
+        total_done = total_failed = 0
+        while True:
+            done, failed = tasks.run_batch(worker, options['batch'])
+            total_done += done
+            total_failed += failed
+            close_old_connections()
+            if done or failed:
+                continue
+            if options['once']:
+                break
+            time.sleep(options['poll'])
+        self.stdout.write(
+            f'Выполнено задач: {total_done}, упало: {total_failed}'
+        )
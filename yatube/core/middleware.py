@@ -0,0 +1,87 @@
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import timing
+from .queries import inspect_queries
+from .routers import replica_reads
+
+PRIMARY_COOKIE = 'primary'
+
+
+class RequestTimingMiddleware:
+    """Замеряет время ответа, запросы к базе и рендер шаблонов
+    и копит их в гистограммах по представлениям.
+
+    Включается настройкой REQUEST_TIMING; без неё Django
+    исключает middleware из цепочки при старте.
+    """
+
+    def __init__(self, get_response):
+        if not settings.REQUEST_TIMING:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with timing.timed_request() as timer:
+            response = self.get_response(request)
+        elapsed = timer.elapsed
+        match = getattr(request, 'resolver_match', None)
+        timing.record(
+            match.view_name if match else '<unresolved>', elapsed, timer
+        )
+        if settings.REQUEST_TIMING_HEADER:
+            response['Server-Timing'] = timing.server_timing(elapsed, timer)
+        return response
+
+
+class QueryInspectionMiddleware:
+    """Пишет в журнал медленные запросы к базе и запросы,
+    повторяющиеся в одном ответе (N+1).
+
+    Включается настройкой QUERY_INSPECTION. С QUERY_INSPECTION_RAISE
+    вместо предупреждения бросает NPlusOneError, что роняет тест.
+    """
+
+    def __init__(self, get_response):
+        if not settings.QUERY_INSPECTION:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        with inspect_queries(
+            label=f'{request.method} {request.path}',
+            raise_errors=settings.QUERY_INSPECTION_RAISE,
+        ):
+            return self.get_response(request)
+
+
+class ReplicaRoutingMiddleware:
+    """Отправляет чтения GET и HEAD на реплики из DATABASE_REPLICAS.
+
+    Если ответ что-то записал, браузер получает cookie на
+    REPLICA_STICKY_SECONDS. Пока она жива, запросы того же
+    пользователя читают основную базу и видят свои изменения,
+    даже если реплика ещё отстаёт.
+    """
+
+    def __init__(self, get_response):
+        if not settings.DATABASE_REPLICAS:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        replicas = (
+            request.method in ('GET', 'HEAD')
+            and PRIMARY_COOKIE not in request.COOKIES
+        )
+        with replica_reads(replicas) as routing:
+            response = self.get_response(request)
+        if routing.wrote:
+            response.set_cookie(
+                PRIMARY_COOKIE,
+                '1',
+                max_age=settings.REPLICA_STICKY_SECONDS,
+                httponly=True,
+                samesite='Lax',
+            )
+        return response
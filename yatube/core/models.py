@@ -0,0 +1,51 @@
+from django.db import models
+from django.utils import timezone
+
+
+class Task(models.Model):
+    """Фоновая задача из core.tasks. Выполненные задачи удаляются,
+    упавшие TASK_MAX_ATTEMPTS раз остаются с failed и ошибкой."""
+    name = models.CharField(max_length=200, verbose_name='Задача')
+    args = models.TextField(default='[]', verbose_name='Аргументы (JSON)')
+    # Есть только у ждущих задач: одинаковые задачи схлопываются
+    # в одну строку, пока её не взял обработчик.
+    key = models.CharField(
+        max_length=40,
+        null=True,
+        unique=True,
+        verbose_name='Ключ'
+    )
+    run_at = models.DateTimeField(
+        default=timezone.now,
+        verbose_name='Выполнить не раньше'
+    )
+    attempts = models.PositiveSmallIntegerField(
+        default=0,
+        verbose_name='Попыток'
+    )
+    locked_by = models.CharField(
+        max_length=64,
+        blank=True,
+        verbose_name='Обработчик'
+    )
+    locked_until = models.DateTimeField(
+        null=True,
+        blank=True,
+        verbose_name='Занята до'
+    )
+    failed = models.BooleanField(default=False, verbose_name='Не удалась')
+    error = models.TextField(blank=True, verbose_name='Ошибка')
+    created = models.DateTimeField(auto_now_add=True, verbose_name='Создана')
+
+    class Meta:
+        indexes = (
+            models.Index(
+                fields=('failed', 'run_at'),
+                name='task_failed_run_at_idx'
+            ),
+        )
+        verbose_name = 'task'
+        verbose_name_plural = 'tasks'
+
+    def __str__(self):
+        return f'{self.name}{self.args}'
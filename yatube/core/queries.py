@@ -0,0 +1,167 @@
+"""Журнал медленных запросов и поиск N+1.
+
+Запросы одного ответа сводятся к «форме»: литералы и списки IN
+заменяются заглушками. Форма, повторённая QUERY_REPEAT_THRESHOLD раз
+и больше, почти всегда означает запрос на каждую строку в цикле —
+о ней пишется предупреждение с местом в шаблоне и стеком вызова.
+"""
+import logging
+import os
+import re
+import sys
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.template.base import Node
+
+logger = logging.getLogger('yatube.queries')
+
+_STRINGS = re.compile(r"'(?:[^']|'')*'")
+_NUMBERS = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LISTS = re.compile(r'\bIN \([^()]*\)', re.IGNORECASE)
+_SPACES = re.compile(r'\s+')
+
+# Сколько кадров стека проекта показывать в предупреждении.
+STACK_DEPTH = 6
+# Кадры самой инструментовки в стеке неинтересны.
+SKIPPED_FILES = frozenset(
+    os.path.join(os.path.dirname(__file__), name)
+    for name in ('queries.py', 'middleware.py', 'timing.py')
+)
+
+
+class NPlusOneError(AssertionError):
+    """Повторяющиеся запросы в режиме QUERY_INSPECTION_RAISE."""
+
+
+def query_shape(sql):
+    """SQL без конкретных значений: одинаковые запросы
+    с разными параметрами дают одну и ту же форму."""
+    shape = _STRINGS.sub('?', sql)
+    shape = _NUMBERS.sub('?', shape)
+    shape = _IN_LISTS.sub('IN (...)', shape)
+    return _SPACES.sub(' ', shape).strip()
+
+
+def _is_project_file(filename):
+    return (
+        filename.startswith(settings.BASE_DIR)
+        and 'site-packages' not in filename
+        and filename not in SKIPPED_FILES
+    )
+
+
+def query_origin():
+    """Место, откуда выполняется запрос: строка шаблона, если запрос
+    сделан при рендере, и ближайшие кадры кода проекта."""
+    template_line = None
+    stack = []
+    frame = sys._getframe(1)
+    while frame is not None:
+        node = frame.f_locals.get('self')
+        code = frame.f_code
+        if (
+            template_line is None
+            and code.co_name == 'render_annotated'
+            and isinstance(node, Node)
+            and getattr(node, 'token', None) is not None
+        ):
+            template_line = (
+                f'{node.origin.template_name}:{node.token.lineno} '
+                f'{node.token.contents[:60]!r}'
+            )
+        elif (
+            len(stack) < STACK_DEPTH
+            and _is_project_file(code.co_filename)
+        ):
+            filename = os.path.relpath(code.co_filename, settings.BASE_DIR)
+            stack.append(f'{filename}:{frame.f_lineno} in {code.co_name}')
+        frame = frame.f_back
+    return template_line, stack
+
+
+class QueryShape:
+    def __init__(self, sql):
+        self.sql = sql
+        self.count = 0
+        self.time = 0.0
+        self.template_line = None
+        self.stack = ()
+
+
+class QueryInspector:
+    """Обёртка для connection.execute_wrapper: пишет в журнал
+    медленные запросы и копит формы запросов для поиска N+1."""
+
+    def __init__(self, threshold=None, slow_ms=None):
+        self.threshold = threshold or settings.QUERY_REPEAT_THRESHOLD
+        self.slow = (
+            slow_ms if slow_ms is not None else settings.SLOW_QUERY_MS
+        ) / 1000
+        self.shapes = {}
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            elapsed = time.perf_counter() - start
+            self.add(sql, params, elapsed)
+
+    def add(self, sql, params, elapsed):
+        if elapsed >= self.slow:
+            logger.warning(
+                'Медленный запрос, %.0f мс: %s; параметры %r',
+                elapsed * 1000, sql, params
+            )
+        shape = query_shape(sql)
+        stats = self.shapes.get(shape)
+        if stats is None:
+            stats = self.shapes[shape] = QueryShape(sql)
+        stats.count += 1
+        stats.time += elapsed
+        if stats.count == 2:
+            # Второй запрос той же формы — уже внутри цикла.
+            stats.template_line, stats.stack = query_origin()
+
+    def repeated(self):
+        return [
+            stats for stats in self.shapes.values()
+            if stats.count >= self.threshold
+        ]
+
+    def describe(self, stats):
+        lines = [
+            f'{stats.count} запросов одной формы '
+            f'за {stats.time * 1000:.1f} мс: {stats.sql}'
+        ]
+        if stats.template_line:
+            lines.append(f'  шаблон: {stats.template_line}')
+        lines.extend(f'  {frame}' for frame in stats.stack)
+        return '\n'.join(lines)
+
+
+@contextmanager
+def inspect_queries(label='', threshold=None, raise_errors=False):
+    """Следит за запросами внутри блока во всех подключениях.
+
+    О повторяющихся запросах пишет предупреждение, а с raise_errors
+    бросает NPlusOneError — так проверка превращается в падение теста:
+
+        with inspect_queries(raise_errors=True):
+            self.client.get(reverse('posts:index'))
+    """
+    inspector = QueryInspector(threshold)
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(inspector))
+        yield inspector
+    repeated = inspector.repeated()
+    if not repeated:
+        return
+    report = '\n'.join(inspector.describe(stats) for stats in repeated)
+    logger.warning('Похоже на N+1 в %s:\n%s', label or 'блоке', report)
+    if raise_errors:
+        raise NPlusOneError(f'N+1 в {label or "блоке"}:\n{report}')
@@ -0,0 +1,68 @@
+"""Чтение с реплик, запись в основную базу.
+
+Реплики задаются в DATABASE_REPLICAS. На реплику уходят только
+чтения внутри replica_reads(): их открывает ReplicaRoutingMiddleware
+для GET и HEAD. Команды, сигналы вне запросов и транзакции читают
+основную базу, иначе они не увидели бы собственных записей.
+
+Реплика выбирается один раз на запрос: реплики синхронизируются
+в разное время, и счётчик с одной из них мог бы не сойтись
+со строками постов с другой.
+"""
+import random
+import threading
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+
+_local = threading.local()
+
+
+class Routing:
+    def __init__(self, replicas):
+        # Реплика для всех чтений запроса или None.
+        self.alias = None
+        if replicas and settings.DATABASE_REPLICAS:
+            self.alias = random.choice(settings.DATABASE_REPLICAS)
+        self.wrote = False
+
+
+def current_routing():
+    return getattr(_local, 'routing', None)
+
+
+@contextmanager
+def replica_reads(replicas=True):
+    """Маршрутизация на время запроса. С replicas=False всё идёт
+    в основную базу, но запись всё равно отмечается в wrote."""
+    routing = Routing(replicas)
+    _local.routing = routing
+    try:
+        yield routing
+    finally:
+        _local.routing = None
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        routing = current_routing()
+        if routing is None or routing.alias is None or routing.wrote:
+            return None
+        if connections[DEFAULT_DB_ALIAS].in_atomic_block:
+            return None
+        return routing.alias
+
+    def db_for_write(self, model, **hints):
+        routing = current_routing()
+        if routing is not None:
+            # Прочитать после записи можно только с основной базы.
+            routing.wrote = True
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, **hints):
+        # Схему на реплики переносит sync_replica вместе с данными.
+        return db == DEFAULT_DB_ALIAS
@@ -0,0 +1,18 @@
+"""Настройки SQLite для каждого нового соединения.
+
+PRAGMA в SQLite действуют на соединение, а не на базу, поэтому
+выставляются по сигналу connection_created. Исключение —
+journal_mode=WAL: он сохраняется в файле, повторная установка
+ничего не стоит. В WAL читатели не ждут писателя, а писатель
+не ждёт читателей.
+"""
+from django.conf import settings
+
+
+def configure_connection(sender, connection, **kwargs):
+    if connection.vendor != 'sqlite':
+        return
+    # Мимо курсора Django: служебные запросы не должны попадать
+    # в счётчики запросов и проверку на N+1.
+    for name, value in settings.SQLITE_PRAGMAS.items():
+        connection.connection.execute(f'PRAGMA {name}={value}')
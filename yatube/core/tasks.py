@@ -0,0 +1,178 @@
+"""Очередь фоновых задач в таблице core_task, без внешнего брокера.
+
+    @tasks.task
+    def generate(image_name): ...
+
+    tasks.defer(generate, post.image.name)
+
+defer() записывает задачу после коммита текущей транзакции: если
+транзакция откатится, задачи не будет, а запрос не ждёт её
+выполнения. Одинаковые ждущие задачи схлопываются в одну строку.
+Выполняет задачи команда run_tasks или, с TASK_QUEUE_IN_PROCESS,
+фоновый поток того же процесса. Упавшая задача повторяется
+с растущей паузой, после TASK_MAX_ATTEMPTS попыток остаётся
+в таблице с failed и текстом ошибки.
+"""
+import hashlib
+import json
+import logging
+import threading
+import traceback
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import close_old_connections, models, transaction
+from django.utils import timezone
+
+from .models import Task
+
+logger = logging.getLogger(__name__)
+
+_registry = {}
+
+
+def task(func):
+    """Регистрирует функцию как задачу под именем модуль.функция.
+    Аргументы задачи должны сериализоваться в JSON."""
+    _registry[f'{func.__module__}.{func.__name__}'] = func
+    return func
+
+
+def task_name(func):
+    name = f'{func.__module__}.{func.__name__}'
+    if _registry.get(name) is not func:
+        raise ValueError(f'{name} не зарегистрирована через @task')
+    return name
+
+
+def task_key(name, args):
+    return hashlib.sha1(f'{name}:{args}'.encode()).hexdigest()
+
+
+def enqueue(func, *args):
+    """Записывает задачу сразу, без ожидания коммита."""
+    name = task_name(func)
+    args = json.dumps(args, sort_keys=True)
+    Task.objects.bulk_create(
+        [Task(name=name, args=args, key=task_key(name, args))],
+        ignore_conflicts=True,
+    )
+    if settings.TASK_QUEUE_IN_PROCESS:
+        in_process_worker.wake()
+
+
+def defer(func, *args):
+    """Ставит задачу в очередь после коммита транзакции."""
+    task_name(func)
+    transaction.on_commit(lambda: enqueue(func, *args))
+
+
+def ready_tasks(now):
+    return Task.objects.filter(
+        models.Q(locked_until__isnull=True) | models.Q(locked_until__lt=now),
+        failed=False,
+        run_at__lte=now,
+    )
+
+
+def claim(worker, limit):
+    """Забирает до limit готовых задач. Условие повторяется
+    в UPDATE, поэтому задачу, которую успел взять другой
+    обработчик, этот не получит. Ключ снимается: новая такая же
+    задача, поставленная во время выполнения, не потеряется."""
+    now = timezone.now()
+    ids = list(
+        ready_tasks(now).order_by('run_at', 'id').values_list(
+            'id', flat=True
+        )[:limit]
+    )
+    if not ids:
+        return []
+    ready_tasks(now).filter(id__in=ids).update(
+        key=None,
+        locked_by=worker,
+        locked_until=now + timedelta(seconds=settings.TASK_LEASE_SECONDS),
+        attempts=models.F('attempts') + 1,
+    )
+    return list(
+        Task.objects.filter(id__in=ids, locked_by=worker).order_by(
+            'run_at', 'id'
+        )
+    )
+
+
+def execute(item):
+    """Выполняет задачу: удачную удаляет, упавшую откладывает."""
+    func = _registry.get(item.name)
+    try:
+        if func is None:
+            raise LookupError(f'Задача {item.name} не зарегистрирована')
+        func(*json.loads(item.args))
+    except Exception:
+        logger.exception('Задача %s упала', item)
+        retry(item, traceback.format_exc())
+        return False
+    Task.objects.filter(pk=item.pk).delete()
+    return True
+
+
+def retry(item, error):
+    changes = {'locked_by': '', 'locked_until': None, 'error': error}
+    if item.attempts >= settings.TASK_MAX_ATTEMPTS:
+        changes['failed'] = True
+    else:
+        delay = settings.TASK_RETRY_DELAY * 2 ** (item.attempts - 1)
+        changes['run_at'] = timezone.now() + timedelta(seconds=delay)
+    Task.objects.filter(pk=item.pk).update(**changes)
+
+
+def run_batch(worker, limit):
+    """Одна пачка задач. Возвращает (выполнено, упало)."""
+    done = failed = 0
+    for item in claim(worker, limit):
+        if execute(item):
+            done += 1
+        else:
+            failed += 1
+    return done, failed
+
+
+def new_worker_id():
+    return f'{threading.get_ident()}-{uuid.uuid4().hex[:12]}'
+
+
+class InProcessWorker:
+    """Фоновый поток, который разбирает очередь после каждой
+    постановки задачи. Задачи лежат в базе, поэтому то, что он
+    не успел до остановки процесса, доделает run_tasks."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.event = threading.Event()
+        self.thread = None
+
+    def wake(self):
+        self.event.set()
+        with self.lock:
+            if self.thread is None:
+                self.thread = threading.Thread(
+                    target=self.run, name='tasks', daemon=True
+                )
+                self.thread.start()
+
+    def run(self):
+        worker = new_worker_id()
+        while True:
+            self.event.wait(settings.TASK_POLL_SECONDS)
+            self.event.clear()
+            try:
+                while any(run_batch(worker, settings.TASK_BATCH_SIZE)):
+                    pass
+            except Exception:
+                logger.exception('Обработчик задач упал')
+            finally:
+                close_old_connections()
+
+
+in_process_worker = InProcessWorker()
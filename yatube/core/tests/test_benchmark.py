@@ -0,0 +1,31 @@
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..benchmark import LocalServer, percentile, run_client, run_load
+
+
+class BenchmarkTest(TestCase):
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(percentile(values, 0.5), 51)
+        self.assertEqual(percentile(values, 0.99), 99)
+        self.assertEqual(percentile([], 0.5), 0)
+
+    def test_run_client_counts_queries(self):
+        result = run_client(Client(), reverse('about:author'), requests=3)
+
+        self.assertEqual(result['requests'], 3)
+        self.assertEqual(result['errors'], 0)
+        self.assertEqual(result['queries_max'], 0)
+
+    def test_run_load_counts_errors(self):
+        with LocalServer() as server:
+            ok = run_load(
+                server.url(reverse('about:author')),
+                requests=4,
+                concurrency=2
+            )
+            missing = run_load(server.url('/missing/'), requests=2)
+
+        self.assertEqual((ok['requests'], ok['errors']), (4, 0))
+        self.assertEqual((missing['requests'], missing['errors']), (0, 2))
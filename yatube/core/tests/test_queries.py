@@ -0,0 +1,56 @@
+from django.contrib.auth import get_user_model
+from django.template import engines
+from django.test import TestCase, override_settings
+
+from posts.models import Post
+
+from ..queries import NPlusOneError, inspect_queries, query_shape
+
+User = get_user_model()
+
+
+class QueryShapeTest(TestCase):
+    def test_literals_and_in_lists_are_replaced(self):
+        self.assertEqual(
+            query_shape("SELECT * FROM t WHERE a = 'x' AND b IN (1, 2, 3)"),
+            'SELECT * FROM t WHERE a = ? AND b IN (...)',
+        )
+        self.assertEqual(
+            query_shape('SELECT * FROM t WHERE id = %s LIMIT 21'),
+            query_shape('SELECT * FROM t WHERE id = %s  LIMIT 1'),
+        )
+
+
+@override_settings(QUERY_REPEAT_THRESHOLD=3, SLOW_QUERY_MS=10_000)
+class InspectQueriesTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        for index in range(4):
+            user = User.objects.create_user(username=f'user{index}')
+            Post.objects.create(author=user, text='Пост')
+
+    def test_reports_template_line(self):
+        template = engines['django'].from_string(
+            '{% for post in posts %}\n{{ post.author.username }}\n{% endfor %}'
+        )
+        with self.assertLogs('yatube.queries', 'WARNING') as logs:
+            with self.assertRaises(NPlusOneError):
+                with inspect_queries(raise_errors=True):
+                    template.render({'posts': Post.objects.all()})
+
+        self.assertIn('4 запросов одной формы', logs.output[0])
+        self.assertIn(":2 'post.author.username'", logs.output[0])
+
+    def test_select_related_passes(self):
+        with inspect_queries(raise_errors=True) as inspector:
+            list(Post.objects.select_related('author'))
+
+        self.assertEqual(inspector.repeated(), [])
+
+    def test_slow_query_is_logged(self):
+        with override_settings(SLOW_QUERY_MS=0):
+            with self.assertLogs('yatube.queries', 'WARNING') as logs:
+                with inspect_queries():
+                    Post.objects.count()
+
+        self.assertIn('Медленный запрос', logs.output[0])
@@ -0,0 +1,89 @@
+import os
+import sqlite3
+import tempfile
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from posts.models import Post
+
+from ..management.commands.sync_replica import copy_database
+from ..middleware import PRIMARY_COOKIE, ReplicaRoutingMiddleware
+from ..routers import PrimaryReplicaRouter, replica_reads
+
+router = PrimaryReplicaRouter()
+
+
+@override_settings(DATABASE_REPLICAS=['replica1'])
+class ReplicaRoutingTest(SimpleTestCase):
+    def view(self, write=False):
+        """Представление, которое запоминает, куда ушли бы чтения."""
+        def view(request):
+            self.reads = [router.db_for_read(Post)]
+            if write:
+                router.db_for_write(Post)
+                self.reads.append(router.db_for_read(Post))
+            return HttpResponse()
+        return ReplicaRoutingMiddleware(view)
+
+    def test_reads_outside_requests_use_primary(self):
+        self.assertIsNone(router.db_for_read(Post))
+        with replica_reads():
+            self.assertEqual(router.db_for_read(Post), 'replica1')
+        self.assertIsNone(router.db_for_read(Post))
+        self.assertEqual(router.db_for_write(Post), 'default')
+
+    def test_get_reads_replica(self):
+        response = self.view()(RequestFactory().get('/'))
+
+        self.assertEqual(self.reads, ['replica1'])
+        self.assertNotIn(PRIMARY_COOKIE, response.cookies)
+
+    def test_write_pins_user_to_primary(self):
+        response = self.view(write=True)(RequestFactory().get('/'))
+
+        self.assertEqual(self.reads, ['replica1', None])
+        self.assertIn(PRIMARY_COOKIE, response.cookies)
+
+        request = RequestFactory().get('/')
+        request.COOKIES[PRIMARY_COOKIE] = '1'
+        self.view()(request)
+        self.assertEqual(self.reads, [None])
+
+    def test_post_reads_primary(self):
+        response = self.view(write=True)(RequestFactory().post('/'))
+
+        self.assertEqual(self.reads, [None, None])
+        self.assertIn(PRIMARY_COOKIE, response.cookies)
+
+    @override_settings(DATABASE_REPLICAS=['replica1', 'replica2'])
+    def test_request_reads_one_replica(self):
+        """Все чтения запроса идут на одну реплику."""
+        for _ in range(20):
+            with replica_reads() as routing:
+                reads = {router.db_for_read(Post) for _ in range(10)}
+            self.assertEqual(reads, {routing.alias})
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_disabled_without_replicas(self):
+        with self.assertRaises(MiddlewareNotUsed):
+            ReplicaRoutingMiddleware(HttpResponse)
+
+
+class CopyDatabaseTest(SimpleTestCase):
+    def test_copy(self):
+        with tempfile.TemporaryDirectory() as directory:
+            source = os.path.join(directory, 'primary.sqlite3')
+            target = os.path.join(directory, 'replica.sqlite3')
+            with sqlite3.connect(source) as db:
+                db.execute('CREATE TABLE item (name TEXT)')
+                db.execute("INSERT INTO item VALUES ('пост')")
+            db.close()
+
+            copy_database(source, target)
+
+            db = sqlite3.connect(target)
+            rows = db.execute('SELECT name FROM item').fetchall()
+            db.close()
+        self.assertEqual(rows, [('пост',)])
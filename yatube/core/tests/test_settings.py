@@ -0,0 +1,34 @@
+import os
+import runpy
+
+from django.core.exceptions import ImproperlyConfigured
+from django.test import SimpleTestCase
+
+import yatube.settings
+
+
+class SettingsTest(SimpleTestCase):
+    @staticmethod
+    def load_settings(**environ):
+        """Выполняет модуль настроек заново с переменными окружения."""
+        saved = dict(os.environ)
+        os.environ.update(environ)
+        try:
+            return runpy.run_path(yatube.settings.__file__)
+        finally:
+            os.environ.clear()
+            os.environ.update(saved)
+
+    def test_cache_backend_from_environment(self):
+        caches = self.load_settings(YATUBE_CACHE='dummy')['CACHES']
+
+        self.assertEqual(
+            caches['default']['BACKEND'],
+            'django.core.cache.backends.dummy.DummyCache'
+        )
+
+    def test_unknown_cache_backend_is_reported(self):
+        with self.assertRaisesMessage(
+            ImproperlyConfigured, 'locmem, file, dummy'
+        ):
+            self.load_settings(YATUBE_CACHE='redis')
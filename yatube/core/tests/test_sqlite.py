@@ -0,0 +1,29 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import SimpleTestCase, override_settings
+
+from ..sqlite import configure_connection
+
+
+@skipUnless(connection.vendor == 'sqlite', 'Только для SQLite')
+class ConfigureConnectionTest(SimpleTestCase):
+    databases = {'default'}
+
+    def pragma(self, name):
+        with connection.cursor() as cursor:
+            cursor.execute(f'PRAGMA {name}')
+            return cursor.fetchone()[0]
+
+    def test_connection_has_pragmas(self):
+        connection.ensure_connection()
+
+        self.assertEqual(self.pragma('busy_timeout'), 5000)
+        self.assertEqual(self.pragma('cache_size'), -20000)
+
+    @override_settings(SQLITE_PRAGMAS={'cache_size': -1000})
+    def test_pragmas_come_from_settings(self):
+        self.addCleanup(configure_connection, None, connection)
+        configure_connection(sender=None, connection=connection)
+
+        self.assertEqual(self.pragma('cache_size'), -1000)
@@ -0,0 +1,85 @@
+from datetime import timedelta
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from .. import tasks
+from ..models import Task
+
+calls = []
+
+
+@tasks.task
+def remember(value):
+    calls.append(value)
+
+
+@tasks.task
+def explode(value):
+    raise ValueError(value)
+
+
+@override_settings(TASK_QUEUE_IN_PROCESS=False, TASK_MAX_ATTEMPTS=2)
+class TaskQueueTest(TestCase):
+    def setUp(self):
+        calls.clear()
+
+    def test_identical_pending_tasks_are_merged(self):
+        tasks.enqueue(remember, 'a')
+        tasks.enqueue(remember, 'a')
+        tasks.enqueue(remember, 'b')
+
+        self.assertEqual(Task.objects.count(), 2)
+        self.assertEqual(tasks.run_batch('worker', 10), (2, 0))
+        self.assertEqual(sorted(calls), ['a', 'b'])
+        self.assertFalse(Task.objects.exists())
+
+    def test_task_queued_while_running_is_kept(self):
+        tasks.enqueue(remember, 'a')
+        running, = tasks.claim('worker', 10)
+        tasks.enqueue(remember, 'a')
+
+        queued, = tasks.claim('other', 10)
+        self.assertNotEqual(running.pk, queued.pk)
+        tasks.execute(running)
+        tasks.execute(queued)
+        self.assertEqual(calls, ['a', 'a'])
+
+    def test_expired_lease_is_claimed_again(self):
+        tasks.enqueue(remember, 'a')
+        tasks.claim('worker', 10)
+        Task.objects.update(locked_until=timezone.now() - timedelta(1))
+
+        item, = tasks.claim('other', 10)
+
+        self.assertEqual((item.locked_by, item.attempts), ('other', 2))
+
+    def test_failed_task_is_retried_then_kept(self):
+        tasks.enqueue(explode, 'boom')
+
+        self.assertEqual(tasks.run_batch('worker', 10), (0, 1))
+        item = Task.objects.get()
+        self.assertGreater(item.run_at, timezone.now())
+        self.assertIn('ValueError: boom', item.error)
+
+        Task.objects.update(run_at=timezone.now())
+        tasks.run_batch('worker', 10)
+        item.refresh_from_db()
+        self.assertTrue(item.failed)
+        self.assertEqual(tasks.run_batch('worker', 10), (0, 0))
+
+    def test_unregistered_function_is_rejected(self):
+        with self.assertRaises(ValueError):
+            tasks.defer(print, 'text')
+
+    def test_run_tasks_command(self):
+        for value in range(5):
+            tasks.enqueue(remember, value)
+        out = StringIO()
+
+        call_command('run_tasks', '--once', '--batch', '2', stdout=out)
+
+        self.assertEqual(sorted(calls), list(range(5)))
+        self.assertIn('Выполнено задач: 5', out.getvalue())
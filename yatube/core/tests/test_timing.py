@@ -0,0 +1,123 @@
+import time
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+from .. import timing
+
+User = get_user_model()
+
+
+@override_settings(REQUEST_TIMING=True, REQUEST_TIMING_HEADER=True)
+class RequestTimingTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='author')
+        Post.objects.create(author=cls.user, text='Пост')
+        cls.staff = User.objects.create_user(username='staff', is_staff=True)
+
+    def setUp(self):
+        timing.reset()
+        self.staff_client = Client()
+        self.staff_client.force_login(self.staff)
+
+    def test_records_queries_and_templates(self):
+        response = Client().get(reverse('posts:index'))
+
+        self.assertIn('Server-Timing', response)
+        self.assertIn('SQL"', response['Server-Timing'])
+        stats = timing.snapshot()['posts:index']
+        self.assertEqual(stats['count'], 1)
+        self.assertGreater(stats['queries_mean'], 0)
+        self.assertGreater(stats['template_mean_ms'], 0)
+        self.assertEqual(sum(stats['histogram'].values()), 1)
+
+    def test_profiles_each_template(self):
+        # Паджинатор внутри кэшированного фрагмента ленты.
+        cache.clear()
+        Client().get(reverse('posts:index'))
+
+        templates = timing.snapshot()['posts:index']['templates']
+        for name in ('posts/index.html', 'posts/base.html',
+                     'includes/header.html', 'includes/paginator.html'):
+            with self.subTest(name=name):
+                self.assertEqual(templates[name]['renders'], 1)
+        index = templates['posts/index.html']
+        base = templates['posts/base.html']
+        # Родитель из extends рендерится внутри наследника.
+        self.assertGreaterEqual(index['mean_ms'], base['mean_ms'])
+        self.assertLess(index['self_mean_ms'], index['mean_ms'])
+
+    def test_disabled_middleware_is_skipped(self):
+        with override_settings(REQUEST_TIMING=False):
+            response = Client().get(reverse('posts:index'))
+
+        self.assertNotIn('Server-Timing', response)
+        self.assertEqual(timing.snapshot(), {})
+
+    def test_stats_endpoint_is_staff_only(self):
+        url = reverse('timing_stats')
+        self.assertEqual(Client().get(url).status_code, 302)
+
+        Client().get(reverse('posts:index'))
+        data = self.staff_client.get(url).json()
+        self.assertTrue(data['enabled'])
+        self.assertIn('posts:index', data['views'])
+
+        self.staff_client.post(url)
+        self.assertNotIn('posts:index', timing.snapshot())
+
+
+class ViewStatsTest(TestCase):
+    def test_quantile_is_bucket_bound(self):
+        stats = timing.ViewStats()
+        timer = timing.RequestTimer()
+        for elapsed in (0.001, 0.002, 0.02, 0.3):
+            stats.add(elapsed, timer)
+
+        self.assertEqual(stats.quantile(0.5), 5)
+        self.assertEqual(stats.quantile(0.75), 25)
+        self.assertEqual(stats.quantile(1), 500)
+
+    def test_nested_template_time_is_not_own_time(self):
+        timer = timing.RequestTimer()
+        with timer.profile_template('outer'):
+            with timer.profile_template('inner'):
+                time.sleep(0.002)
+
+        renders, total, own = timer.templates['outer']
+        self.assertEqual(renders, 1)
+        self.assertGreaterEqual(total, timer.templates['inner'][1])
+        self.assertLess(own, 0.002)
+
+
+class ProfileTemplatesCommandTest(TestCase):
+    def test_reports_templates(self):
+        out = StringIO()
+
+        call_command('profile_templates', '/', '--requests', '2', stdout=out)
+
+        self.assertIn('includes/header.html', out.getvalue())
+
+    @override_settings(REQUEST_TIMING=True)
+    def test_reports_templates_with_request_timing(self):
+        out = StringIO()
+
+        call_command('profile_templates', '/', '--requests', '2', stdout=out)
+
+        self.assertIn('includes/header.html', out.getvalue())
+
+    def test_nested_block_continues_outer_timer(self):
+        with timing.timed_request() as outer:
+            with timing.timed_request() as inner:
+                User.objects.exists()
+            self.assertIs(inner, outer)
+            self.assertIs(timing.current_timer(), outer)
+        self.assertEqual(outer.queries, 1)
+        self.assertIsNone(timing.current_timer())
@@ -0,0 +1,257 @@
+"""Замеры времени ответов: полного, запросов к базе и шаблонов.
+
+Замер текущего запроса живёт в локальной для потока переменной:
+его заполняют обёртка выполнения SQL и шаблонный бэкенд
+TimedDjangoTemplates, а RequestTimingMiddleware складывает итог
+в гистограммы по представлениям. Гистограммы хранятся в памяти
+процесса, у каждого воркера свои.
+
+Время отдельных шаблонов, включая {% include %} и {% extends %},
+считает install_template_profiler(): Django входит в любой шаблон
+через RenderContext.push_state. Блоки наследника рендерятся внутри
+родителя, поэтому их время попадает в собственное время родителя.
+"""
+import math
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.db import connections
+from django.template.backends.django import DjangoTemplates, Template
+from django.template.context import RenderContext
+
+# Верхние границы корзин гистограммы, мс.
+BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, math.inf)
+
+_local = threading.local()
+
+
+class RequestTimer:
+    """Замер одного запроса. Сам служит обёрткой для
+    connection.execute_wrapper и считает время SQL."""
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        # Имя шаблона → [рендеров, полное время, собственное время].
+        self.templates = {}
+        self._template_stack = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += time.perf_counter() - start
+            self.queries += 1
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    @contextmanager
+    def template(self):
+        """Учитывает только внешний рендер, вложенный уже внутри."""
+        self.template_depth += 1
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.template_depth -= 1
+            if not self.template_depth:
+                self.template_time += time.perf_counter() - start
+
+    @contextmanager
+    def profile_template(self, name):
+        """Полное и собственное (без вложенных шаблонов) время."""
+        self._template_stack.append(0.0)
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            nested = self._template_stack.pop()
+            if self._template_stack:
+                self._template_stack[-1] += elapsed
+            entry = self.templates.setdefault(name, [0, 0.0, 0.0])
+            entry[0] += 1
+            entry[1] += elapsed
+            entry[2] += elapsed - nested
+
+
+def current_timer():
+    return getattr(_local, 'timer', None)
+
+
+@contextmanager
+def timed_request():
+    """Замеряет всё, что выполняется внутри блока в этом потоке.
+    Вложенный блок продолжает внешний замер: так время не уходит
+    от profile_templates к включённому RequestTimingMiddleware."""
+    timer = current_timer()
+    if timer is not None:
+        yield timer
+        return
+    timer = RequestTimer()
+    _local.timer = timer
+    try:
+        with ExitStack() as stack:
+            for connection in connections.all():
+                stack.enter_context(connection.execute_wrapper(timer))
+            yield timer
+    finally:
+        _local.timer = None
+
+
+class ViewStats:
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.queries = 0
+        self.db_time = 0.0
+        self.template_time = 0.0
+        self.templates = {}
+        self.buckets = [0] * len(BUCKETS_MS)
+
+    def add(self, elapsed, timer):
+        self.count += 1
+        self.total += elapsed
+        self.max = max(self.max, elapsed)
+        self.queries += timer.queries
+        self.db_time += timer.db_time
+        self.template_time += timer.template_time
+        for name, (renders, total, own) in timer.templates.items():
+            entry = self.templates.setdefault(name, [0, 0.0, 0.0])
+            entry[0] += renders
+            entry[1] += total
+            entry[2] += own
+        milliseconds = elapsed * 1000
+        for index, bound in enumerate(BUCKETS_MS):
+            if milliseconds <= bound:
+                self.buckets[index] += 1
+                break
+
+    def quantile(self, share):
+        """Оценка перцентиля сверху: граница корзины, в которую он попал."""
+        rank = share * self.count
+        seen = 0
+        for bound, count in zip(BUCKETS_MS, self.buckets):
+            seen += count
+            if seen >= rank:
+                return bound if bound != math.inf else self.max * 1000
+        return self.max * 1000
+
+    def as_dict(self):
+        return {
+            'count': self.count,
+            'mean_ms': round(self.total / self.count * 1000, 2),
+            'p50_ms': round(self.quantile(0.50), 2),
+            'p95_ms': round(self.quantile(0.95), 2),
+            'max_ms': round(self.max * 1000, 2),
+            'queries_mean': round(self.queries / self.count, 2),
+            'db_mean_ms': round(self.db_time / self.count * 1000, 2),
+            'template_mean_ms': round(
+                self.template_time / self.count * 1000, 2
+            ),
+            'histogram': {
+                'le_inf' if bound == math.inf else f'le_{bound}': count
+                for bound, count in zip(BUCKETS_MS, self.buckets)
+            },
+            'templates': template_stats(self.templates, self.count),
+        }
+
+
+def template_stats(templates, requests):
+    """Средние на запрос по шаблонам, самые дорогие
+    по собственному времени — первыми."""
+    rows = sorted(templates.items(), key=lambda item: -item[1][2])
+    return {
+        name: {
+            'renders': round(renders / requests, 2),
+            'mean_ms': round(total / requests * 1000, 3),
+            'self_mean_ms': round(own / requests * 1000, 3),
+        }
+        for name, (renders, total, own) in rows
+    }
+
+
+_stats = {}
+_stats_lock = threading.Lock()
+
+
+def record(view_name, elapsed, timer):
+    with _stats_lock:
+        stats = _stats.get(view_name)
+        if stats is None:
+            stats = _stats[view_name] = ViewStats()
+        stats.add(elapsed, timer)
+
+
+def snapshot():
+    """Гистограммы по представлениям, самые медленные в среднем — первыми."""
+    with _stats_lock:
+        views = {name: stats.as_dict() for name, stats in _stats.items()}
+    return dict(
+        sorted(views.items(), key=lambda item: -item[1]['mean_ms'])
+    )
+
+
+def reset():
+    with _stats_lock:
+        _stats.clear()
+
+
+def server_timing(elapsed, timer):
+    """Значение заголовка Server-Timing для браузерных DevTools."""
+    return ', '.join((
+        f'total;dur={elapsed * 1000:.1f}',
+        f'db;dur={timer.db_time * 1000:.1f};desc="{timer.queries} SQL"',
+        f'tpl;dur={timer.template_time * 1000:.1f}',
+    ))
+
+
+_push_state = RenderContext.push_state
+
+
+@contextmanager
+def profiled_push_state(self, template, isolated_context=True):
+    timer = current_timer()
+    with _push_state(self, template, isolated_context):
+        if timer is None:
+            yield
+        else:
+            with timer.profile_template(template.name or '<строка>'):
+                yield
+
+
+def install_template_profiler():
+    """Подменяет RenderContext.push_state, как это делает
+    django-debug-toolbar. Без замера подмена стоит одну
+    проверку на каждый шаблон."""
+    RenderContext.push_state = profiled_push_state
+
+
+class TimedTemplate(Template):
+    def render(self, context=None, request=None):
+        timer = current_timer()
+        if timer is None:
+            return super().render(context, request)
+        with timer.template():
+            return super().render(context, request)
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Шаблоны Django, время рендера которых попадает в замер запроса.
+    Без замера обёртка стоит одну проверку на рендер."""
+
+    def from_string(self, template_code):
+        template = super().from_string(template_code)
+        return TimedTemplate(template.template, self)
+
+    def get_template(self, template_name):
+        template = super().get_template(template_name)
+        return TimedTemplate(template.template, self)
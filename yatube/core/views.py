@@ -1,4 +1,10 @@
+from django.conf import settings
+from django.contrib.admin.views.decorators import staff_member_required
+from django.http import JsonResponse
 from django.shortcuts import render
+from django.views.decorators.http import require_http_methods
+
+from . import timing
 
 
 def page_not_found(request, exception):
@@ -7,3 +13,15 @@ def page_not_found(request, exception):
 
 def csrf_failure(request, reason=''):
     return render(request, 'core/403csrf.html')
+
+
+@staff_member_required
+@require_http_methods(['GET', 'POST'])
+def timing_stats(request):
+    """Гистограммы времени ответов этого процесса; POST их обнуляет."""
+    if request.method == 'POST':
+        timing.reset()
+    return JsonResponse({
+        'enabled': settings.REQUEST_TIMING,
+        'views': timing.snapshot(),
+    })
@@ -1,6 +1,24 @@
 from django.contrib import admin
+from django.http import StreamingHttpResponse
 
-from .models import Post, Group
+from .export import export_lines, gzip_stream
+from .models import Comment, Post, Group
+
+
+def export_action(file_format):
+    def export(modeladmin, request, queryset):
+        response = StreamingHttpResponse(
+            gzip_stream(export_lines(file_format, queryset)),
+            content_type='application/gzip'
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="posts.{file_format}.gz"'
+        )
+        return response
+
+    export.__name__ = f'export_{file_format}'
+    export.short_description = f'Выгрузить в {file_format.upper()} (gzip)'
+    return export
 
 
 @admin.register(Post)
@@ -9,6 +27,17 @@ class PostAdmin(admin.ModelAdmin):
     list_editable = ('group',)
     search_fields = ('text',)
     list_filter = ('pub_date',)
+    actions = (export_action('jsonl'), export_action('csv'))
+
+    empty_value_display = '-пусто-'
+
+
+@admin.register(Comment)
+class CommentAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'text', 'created', 'author', 'post')
+    list_select_related = ('author', 'post')
+    raw_id_fields = ('author', 'post')
+    list_filter = ('created',)
 
     empty_value_display = '-пусто-'
 
@@ -1,5 +1,22 @@
 from django.apps import AppConfig
+from django.db.models.signals import post_migrate
+
+
+def restore_search_index(using, **kwargs):
+    """Возвращает триггеры поиска, если миграция пересоздала posts_post."""
+    from django.db import connections
+
+    from .search import ensure_search_index
+
+    connection = connections[using]
+    if 'posts_post_fts' in connection.introspection.table_names():
+        ensure_search_index(connection)
 
 
 class PostsConfig(AppConfig):
     name = 'posts'
+
+    def ready(self):
+        from . import signals  # noqa: F401
+
+        post_migrate.connect(restore_search_index, sender=self)
@@ -0,0 +1,100 @@
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+INDEX = 'index'
+GROUP = 'group'
+AUTHOR = 'author'
+
+HITS_KEY = 'feed:hits'
+MISSES_KEY = 'feed:misses'
+
+
+def _version_key(feed, owner_id):
+    return f'feed:version:{feed}:{owner_id}'
+
+
+def feed_version(feed, owner_id=0):
+    """Текущее поколение ленты. Все ключи ленты содержат его,
+    поэтому для сброса всех страниц достаточно сменить поколение."""
+    key = _version_key(feed, owner_id)
+    version = cache.get(key)
+    if version is None:
+        # Начинаем со времени, а не с единицы: если ключ поколения
+        # вытеснен из кэша, старые фрагменты не оживут.
+        version = int(time.time() * 1000)
+        cache.add(key, version, None)
+        version = cache.get(key, version)
+    return version
+
+
+def bump_version(feed, owner_id=0):
+    key = _version_key(feed, owner_id)
+    try:
+        cache.incr(key)
+    except ValueError:
+        feed_version(feed, owner_id)
+
+
+def fragment_key(feed, owner_id, page_obj):
+    """Ключ фрагмента страницы ленты.
+
+    Для главной поколение входит только в ключ первой страницы:
+    новый пост сбрасывает её, а глубокие страницы живут
+    до истечения FEED_CACHE_TIMEOUT.
+    """
+    version = 0
+    if feed != INDEX or page_obj.number == 1:
+        version = feed_version(feed, owner_id)
+    per_page = page_obj.paginator.per_page
+    return f'feed:{feed}:{owner_id}:{version}:{per_page}:{page_obj.token}'
+
+
+def get_fragment(key):
+    fragment = cache.get(key)
+    _count(MISSES_KEY if fragment is None else HITS_KEY)
+    return fragment
+
+
+def set_fragment(key, fragment):
+    cache.set(key, fragment, settings.FEED_CACHE_TIMEOUT)
+
+
+def _count(key):
+    if cache.add(key, 1, None):
+        return
+    try:
+        cache.incr(key)
+    except ValueError:
+        # Ключ успел пропасть из кэша: статистика приблизительная.
+        pass
+
+
+def stats():
+    return {
+        'hits': cache.get(HITS_KEY, 0),
+        'misses': cache.get(MISSES_KEY, 0),
+    }
+
+
+def reset_stats():
+    cache.delete_many((HITS_KEY, MISSES_KEY))
+
+
+def invalidate_post(post, old_group_id=None):
+    """Сбрасывает ленты, в которых пост появился, изменился или исчез."""
+    bump_version(INDEX)
+    bump_version(AUTHOR, post.author_id)
+    for group_id in {post.group_id, old_group_id} - {None}:
+        bump_version(GROUP, group_id)
+
+
+def invalidate_author(author_id, group_ids):
+    """Сбрасывает ленты, где выводится имя автора: профиль, а если
+    у автора есть посты — главную и группы из group_ids."""
+    bump_version(AUTHOR, author_id)
+    if group_ids:
+        bump_version(INDEX)
+    for group_id in set(group_ids) - {None}:
+        bump_version(GROUP, group_id)
@@ -0,0 +1,180 @@
+"""Условные GET для лент и страницы поста.
+
+Валидаторы берутся из строк Counter: кроме числа постов ленты
+в них хранится время последнего изменения её постов, которое сигналы
+обновляют при создании, правке и удалении. Поэтому ETag
+и Last-Modified считаются одним запросом по уникальному индексу
+счётчиков, и на совпавший валидатор ответ 304 отдаётся без рендера.
+В ETag лент входит и поколение их кэша из posts.cache: оно меняется
+при правке группы или автора, которую счётчики не замечают.
+"""
+import hashlib
+from functools import wraps
+
+from django.db.models import Exists, OuterRef, Subquery
+from django.utils.cache import patch_cache_control
+from django.views.decorators.http import condition
+
+from . import cache as feed_cache
+from .models import Counter, Follow, Group, Post, User
+
+
+def counter(scope, object_id, field):
+    return Subquery(
+        Counter.objects.filter(
+            scope=scope,
+            object_id=object_id
+        ).values(field)[:1]
+    )
+
+
+def feed_state(scope, object_id, **annotations):
+    """Значение, время изменения и id владельца счётчика ленты
+    и annotations к нему. Пока счётчика нет, валидатора тоже нет:
+    его создаст первый полный ответ."""
+    row = Counter.objects.filter(
+        scope=scope,
+        object_id=object_id
+    ).annotate(**annotations).values_list(
+        'value', 'modified', 'object_id', *annotations
+    ).first()
+    if row is None:
+        return None, None
+    return row, row[1]
+
+
+def group_id(slug):
+    return Subquery(Group.objects.filter(slug=slug).values('id')[:1])
+
+
+def author_id(username):
+    return Subquery(
+        User.objects.filter(username=username).values('id')[:1]
+    )
+
+
+def versioned_state(feed, scope, object_id, **annotations):
+    """feed_state плюс поколение кэша ленты. Поколение меняется
+    и при правке группы или автора, которую счётчик не видит."""
+    parts, last_modified = feed_state(scope, object_id, **annotations)
+    if parts is None:
+        return None, None
+    owner_id = parts[2]
+    return (*parts, feed_cache.feed_version(feed, owner_id)), last_modified
+
+
+def index_state(request):
+    return versioned_state(feed_cache.INDEX, Counter.TOTAL, 0)
+
+
+def group_state(request, slug):
+    return versioned_state(
+        feed_cache.GROUP, Counter.GROUP, group_id(slug)
+    )
+
+
+def profile_state(request, username):
+    annotations = {}
+    if request.user.is_authenticated:
+        annotations['following'] = Exists(Follow.objects.filter(
+            user_id=request.user.pk,
+            author_id=OuterRef('object_id')
+        ))
+    return versioned_state(
+        feed_cache.AUTHOR, Counter.AUTHOR, author_id(username), **annotations
+    )
+
+
+# Ленты для читалок и API не зависят от пользователя и совпадают
+# с HTML-страницами по данным.
+def index_feed_state(request, **kwargs):
+    return index_state(request)
+
+
+def group_feed_state(request, slug, **kwargs):
+    return group_state(request, slug)
+
+
+def author_feed_state(request, username, **kwargs):
+    return versioned_state(
+        feed_cache.AUTHOR, Counter.AUTHOR, author_id(username)
+    )
+
+
+def post_state(request, post_id):
+    """Пост, его комментарии и счётчик постов автора на странице.
+    Имя автора и название группы учитываются через поколения
+    их лент в кэше."""
+    row = Post.objects.filter(pk=post_id).annotate(
+        comment_count=counter(Counter.COMMENTS, OuterRef('pk'), 'value'),
+        comments_modified=counter(
+            Counter.COMMENTS, OuterRef('pk'), 'modified'
+        ),
+        author_post_count=counter(
+            Counter.AUTHOR, OuterRef('author_id'), 'value'
+        ),
+        author_modified=counter(
+            Counter.AUTHOR, OuterRef('author_id'), 'modified'
+        ),
+    ).values_list(
+        'edited', 'comment_count', 'comments_modified',
+        'author_post_count', 'author_modified', 'author_id', 'group_id'
+    ).first()
+    if row is None:
+        return None, None
+    (edited, _, comments_modified, _, author_modified,
+     post_author_id, post_group_id) = row
+    parts = (*row, feed_cache.feed_version(feed_cache.AUTHOR, post_author_id))
+    if post_group_id:
+        parts += (feed_cache.feed_version(feed_cache.GROUP, post_group_id),)
+    return parts, max(filter(None, (
+        edited, comments_modified, author_modified
+    )))
+
+
+def cached_state(state_func, request, *args, **kwargs):
+    """state_func считается один раз на запрос."""
+    if not hasattr(request, '_page_state'):
+        request._page_state = state_func(request, *args, **kwargs)
+    return request._page_state
+
+
+def page_etag(request, per_user=True):
+    """Слабый ETag по данным cached_state. ETag слабый: токен CSRF
+    в формах разный в каждом ответе, хотя страница та же."""
+    parts, _ = request._page_state
+    if parts is None:
+        return None
+    if per_user:
+        parts = (request.user.pk, parts)
+    return 'W/"{}"'.format(hashlib.md5(repr(parts).encode()).hexdigest())
+
+
+def conditional_page(state_func, per_user=True):
+    """Отвечает 304, если ETag или Last-Modified страницы не изменились.
+
+    state_func(request, *args, **kwargs) возвращает данные для ETag
+    и время изменения. HTML-страницы зависят от пользователя (шапка,
+    кнопки), поэтому с per_user его id тоже входит в ETag.
+    """
+    def etag(request, *args, **kwargs):
+        cached_state(state_func, request, *args, **kwargs)
+        return page_etag(request, per_user)
+
+    def last_modified(request, *args, **kwargs):
+        return cached_state(state_func, request, *args, **kwargs)[1]
+
+    def decorator(view):
+        view = condition(etag_func=etag, last_modified_func=last_modified)(
+            view
+        )
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            response = view(request, *args, **kwargs)
+            # Без no-cache браузер сам решит по Last-Modified,
+            # что страница свежая, и не спросит сервер.
+            patch_cache_control(response, no_cache=True)
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,69 @@
+"""Потоковая выгрузка постов в JSONL и CSV.
+
+Строки читаются из базы пачками через values_list().iterator(),
+поэтому память не зависит от размера таблицы. Формат совпадает
+с тем, что принимает import_posts.
+"""
+import csv
+import io
+import json
+import zlib
+
+from .models import Post
+
+COLUMNS = (
+    ('id', 'id'),
+    ('text', 'text'),
+    ('pub_date', 'pub_date'),
+    ('author', 'author__username'),
+    ('group', 'group__slug'),
+)
+FORMATS = ('jsonl', 'csv')
+CHUNK_SIZE = 2000
+
+
+def export_rows(queryset=None, chunk_size=CHUNK_SIZE):
+    if queryset is None:
+        queryset = Post.objects.all()
+    return queryset.order_by('id').values_list(
+        *(lookup for _, lookup in COLUMNS)
+    ).iterator(chunk_size=chunk_size)
+
+
+def _jsonl_lines(rows):
+    names = [name for name, _ in COLUMNS]
+    for row in rows:
+        record = dict(zip(names, row))
+        record['pub_date'] = record['pub_date'].isoformat()
+        yield json.dumps(record, ensure_ascii=False) + '\n'
+
+
+def _csv_lines(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(name for name, _ in COLUMNS)
+    for row in rows:
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        id_, text, pub_date, author, group = row
+        writer.writerow((id_, text, pub_date.isoformat(), author, group))
+    yield buffer.getvalue()
+
+
+def export_lines(file_format, queryset=None, chunk_size=CHUNK_SIZE):
+    """Строки выгрузки одна за другой, для CSV — с заголовком."""
+    rows = export_rows(queryset, chunk_size)
+    if file_format == 'csv':
+        return _csv_lines(rows)
+    return _jsonl_lines(rows)
+
+
+def gzip_stream(lines):
+    """Сжимает строки в gzip на лету, отдавая байты кусками."""
+    compressor = zlib.compressobj(wbits=16 + zlib.MAX_WBITS)
+    for line in lines:
+        chunk = compressor.compress(line.encode())
+        if chunk:
+            yield chunk
+    yield compressor.flush()
@@ -0,0 +1,183 @@
+"""Ленты RSS, Atom и JSON Feed для главной, групп и авторов.
+
+Готовый ответ кэшируется по ETag из conditional.index_feed_state
+и соседних функций: в него входят счётчик ленты и поколение её кэша,
+поэтому любая правка постов, группы или автора даёт новый ключ.
+Опрос неизменившейся ленты стоит одного запроса к счётчикам
+и отвечается 304 или телом из кэша.
+"""
+import json
+
+from django.conf import settings
+from django.contrib.syndication.views import Feed
+from django.core.cache import cache
+from django.http import Http404, HttpResponse
+from django.shortcuts import get_object_or_404
+from django.urls import reverse
+from django.utils.feedgenerator import (
+    Atom1Feed, Rss201rev2Feed, SyndicationFeed
+)
+from django.utils.text import Truncator
+
+from .conditional import (
+    author_feed_state, conditional_page, group_feed_state, index_feed_state,
+    page_etag
+)
+from .models import Counter, Group, Post, User
+
+TITLE_WORDS = 10
+
+
+class JSONFeedGenerator(SyndicationFeed):
+    """JSON Feed 1.1: https://www.jsonfeed.org/version/1.1/"""
+    content_type = 'application/feed+json; charset=utf-8'
+
+    def write(self, outfile, encoding):
+        feed = {
+            'version': 'https://jsonfeed.org/version/1.1',
+            'title': self.feed['title'],
+            'home_page_url': self.feed['link'],
+            'feed_url': self.feed['feed_url'],
+            'description': self.feed['description'],
+            'language': self.feed['language'],
+            'items': [self.item(item) for item in self.items],
+        }
+        outfile.write(json.dumps(feed, ensure_ascii=False))
+
+    @staticmethod
+    def item(item):
+        data = {
+            'id': item['unique_id'] or item['link'],
+            'url': item['link'],
+            'title': item['title'],
+            'content_text': item['description'],
+            'date_published': item['pubdate'].isoformat(),
+            'authors': [{'name': item['author_name']}],
+        }
+        if item['updateddate']:
+            data['date_modified'] = item['updateddate'].isoformat()
+        return data
+
+
+FEED_TYPES = {
+    'rss': Rss201rev2Feed,
+    'atom': Atom1Feed,
+    'json': JSONFeedGenerator,
+}
+
+
+class PostFeed(Feed):
+    """Последние посты ленты в том же порядке и с теми же
+    колонками, что и на HTML-страницах."""
+    def __init__(self, feed_type):
+        self.feed_type = feed_type
+
+    def counter(self, obj):
+        return Counter.TOTAL, 0
+
+    def posts(self, obj):
+        return Post.objects.for_feed()
+
+    def items(self, obj):
+        # Заводит счётчик, по которому считается ETag ленты.
+        Counter.objects.value(*self.counter(obj))
+        return self.posts(obj)[:settings.SYNDICATION_ITEMS]
+
+    def title(self, obj):
+        return 'Yatube: последние обновления'
+
+    def link(self, obj):
+        return reverse('posts:index')
+
+    def description(self, obj):
+        return self.title(obj)
+
+    def item_title(self, item):
+        return Truncator(item.text).words(TITLE_WORDS)
+
+    def item_description(self, item):
+        return item.text
+
+    def item_link(self, item):
+        return reverse('posts:post_detail', args=(item.pk,))
+
+    def item_author_name(self, item):
+        return item.author.get_full_name() or item.author.username
+
+    def item_pubdate(self, item):
+        return item.pub_date
+
+    def item_updateddate(self, item):
+        return item.edited
+
+
+class GroupPostFeed(PostFeed):
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def counter(self, obj):
+        return Counter.GROUP, obj.pk
+
+    def posts(self, obj):
+        return Post.objects.for_feed().filter(group=obj)
+
+    def title(self, obj):
+        return f'Yatube: {obj.title}'
+
+    def link(self, obj):
+        return reverse('posts:group_posts', args=(obj.slug,))
+
+    def description(self, obj):
+        return obj.description or self.title(obj)
+
+
+class AuthorPostFeed(PostFeed):
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def counter(self, obj):
+        return Counter.AUTHOR, obj.pk
+
+    def posts(self, obj):
+        return Post.objects.for_feed().filter(author=obj)
+
+    def title(self, obj):
+        return f'Yatube: {obj.get_full_name() or obj.username}'
+
+    def link(self, obj):
+        return reverse('posts:profile', args=(obj.username,))
+
+
+def syndication_view(feed_class, state_func):
+    feeds = {
+        feed_format: feed_class(feed_type)
+        for feed_format, feed_type in FEED_TYPES.items()
+    }
+
+    @conditional_page(state_func, per_user=False)
+    def view(request, feed_format, **kwargs):
+        if feed_format not in feeds:
+            raise Http404('Неизвестный формат ленты')
+        etag = page_etag(request, per_user=False)
+        key = f'syndication:{feed_format}:{request.path}:{etag}'
+        if etag is not None:
+            cached = cache.get(key)
+            if cached is not None:
+                content_type, content = cached
+                return HttpResponse(content, content_type=content_type)
+        response = feeds[feed_format](request, **kwargs)
+        # Last-Modified выставит conditional_page по счётчику ленты.
+        del response['Last-Modified']
+        if etag is not None:
+            cache.set(
+                key,
+                (response['Content-Type'], response.content),
+                settings.FEED_CACHE_TIMEOUT
+            )
+        return response
+    return view
+
+
+index_feed = syndication_view(PostFeed, index_feed_state)
+group_feed = syndication_view(GroupPostFeed, group_feed_state)
+author_feed = syndication_view(AuthorPostFeed, author_feed_state)
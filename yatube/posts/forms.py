@@ -1,6 +1,8 @@
 from django import forms
+from django.conf import settings
 
-from .models import Post
+from .models import Comment, Post
+from .uploads import downscale
 
 
 class PostForm(forms.ModelForm):
@@ -12,3 +14,41 @@ class PostForm(forms.ModelForm):
             'text': 'Текст поста',
             'group': 'Группа',
         }
+
+
+class BoundedImageField(forms.ImageField):
+    """ImageField, который сообщает причину, по которой
+    ImageUploadHandler отклонил загрузку."""
+
+    def to_python(self, data):
+        upload_error = getattr(data, 'upload_error', None)
+        if upload_error:
+            raise forms.ValidationError(upload_error, code='rejected')
+        return super().to_python(data)
+
+
+class PostImageForm(forms.ModelForm):
+    """Картинка поста. Отдельная форма, чтобы PostForm оставалась
+    формой текста и группы."""
+
+    image = BoundedImageField(label='Картинка', required=False)
+
+    class Meta:
+        model = Post
+        fields = ('image',)
+
+    def clean_image(self):
+        image = self.cleaned_data['image']
+        if image and hasattr(image, 'temporary_file_path'):
+            image = downscale(image, settings.POST_IMAGE_MAX_DIMENSION)
+        return image
+
+
+class CommentForm(forms.ModelForm):
+
+    class Meta:
+        model = Comment
+        fields = ('text',)
+        labels = {
+            'text': 'Текст комментария',
+        }
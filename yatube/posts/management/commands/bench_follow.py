@@ -0,0 +1,120 @@
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from posts.models import Follow, Post, TimelineEntry, User
+from posts.timeline import TimelinePaginator
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Сравнивает время чтения ленты подписок из TimelineEntry '
+        'и наивным запросом author__in при разном числе подписок. '
+        'Данные создаются внутри транзакции и откатываются.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--follows', type=int, nargs='+', default=[1000, 10000]
+        )
+        parser.add_argument('--posts-per-author', type=int, default=5)
+        parser.add_argument('--other-posts', type=int, default=100_000)
+        parser.add_argument('--repeat', type=int, default=20)
+
+    def handle(self, *args, **options):
+        for follows in options['follows']:
+            try:
+                with transaction.atomic():
+                    reader = self.seed(
+                        follows,
+                        options['posts_per_author'],
+                        options['other_posts']
+                    )
+                    self.compare(follows, reader, options['repeat'])
+                    raise Rollback
+            except Rollback:
+                pass
+
+    def seed(self, follows, posts_per_author, other_posts):
+        reader = User.objects.create(username='bench_reader')
+        outsider = User.objects.create(username='bench_outsider')
+        User.objects.bulk_create(
+            (User(username=f'bench_author{num}') for num in range(follows)),
+            batch_size=500
+        )
+        authors = list(
+            User.objects.filter(username__startswith='bench_author')
+            .values_list('id', flat=True)
+        )
+        Post.objects.bulk_create(
+            (
+                Post(author_id=outsider.pk, text=f'Шум {num}')
+                for num in range(other_posts)
+            ),
+            batch_size=500
+        )
+        Post.objects.bulk_create(
+            (
+                Post(author_id=author_id, text=f'Пост {num}')
+                for num in range(posts_per_author)
+                for author_id in authors
+            ),
+            batch_size=500
+        )
+        Follow.objects.bulk_create(
+            (
+                Follow(user=reader, author_id=author_id)
+                for author_id in authors
+            ),
+            batch_size=500
+        )
+        # bulk_create не шлёт сигналов, поэтому раскладываем посты сами.
+        TimelineEntry.objects.bulk_create(
+            (
+                TimelineEntry(
+                    user=reader,
+                    post_id=post_id,
+                    author_id=author_id,
+                    pub_date=pub_date,
+                )
+                for post_id, author_id, pub_date in Post.objects.filter(
+                    author_id__in=Follow.objects.filter(
+                        user=reader
+                    ).values('author_id')
+                ).values_list('id', 'author_id', 'pub_date').iterator()
+            ),
+            batch_size=500
+        )
+        return reader
+
+    def compare(self, follows, reader, repeat):
+        per_page = settings.POST_PER_PAGE
+        followed = Follow.objects.filter(user=reader).values('author_id')
+
+        def naive():
+            return list(
+                Post.objects.for_feed().filter(author_id__in=followed)
+                [:per_page]
+            )
+
+        def fan_out():
+            return list(TimelinePaginator(reader.pk, per_page).first_page())
+
+        self.stdout.write(f'Подписок: {follows}')
+        for title, read in (('author__in', naive), ('TimelineEntry', fan_out)):
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                read()
+                timings.append((time.perf_counter() - started) * 1000)
+            self.stdout.write(
+                f'  {title}: медиана {statistics.median(timings):.2f} мс, '
+                f'максимум {max(timings):.2f} мс'
+            )
@@ -0,0 +1,92 @@
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+
+from posts.models import Post, User
+from posts.search import SearchResults
+
+WORDS = (
+    'утро вечер город море лес река дорога книга письмо песня '
+    'окно кофе кошка собака поезд снег дождь ветер солнце луна '
+    'друг работа школа музыка театр парк мост сад поле небо'
+).split()
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет базу случайными постами внутри транзакции, '
+        'сравнивает поиск через LIKE и через FTS5 и откатывает данные.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=1_000_000)
+        parser.add_argument('--query', default='кошка дождь')
+        parser.add_argument('--repeat', type=int, default=5)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда поддерживает только SQLite')
+        try:
+            with transaction.atomic():
+                self.seed(options['posts'])
+                self.compare(options['query'], options['repeat'])
+                raise Rollback
+        except Rollback:
+            pass
+
+    def seed(self, total):
+        author, _ = User.objects.get_or_create(username='bench_search')
+        now = timezone.now().isoformat()
+        started = time.perf_counter()
+        with connection.cursor() as cursor:
+            batch = []
+            for _ in range(total):
+                text = ' '.join(random.choices(WORDS, k=30))
+                batch.append((text, now, now, author.pk))
+                if len(batch) == 10_000:
+                    self.insert(cursor, batch)
+                    batch = []
+            self.insert(cursor, batch)
+        elapsed = time.perf_counter() - started
+        self.stdout.write(f'Добавлено постов: {total} за {elapsed:.1f} с')
+
+    @staticmethod
+    def insert(cursor, batch):
+        cursor.executemany(
+            'INSERT INTO posts_post '
+            '(text, pub_date, edited, author_id, image) '
+            "VALUES (%s, %s, %s, %s, '')",
+            batch,
+        )
+
+    def compare(self, query, repeat):
+        words = query.split()
+        like = Post.objects.all()
+        for word in words:
+            like = like.filter(text__icontains=word)
+        runs = (
+            ('LIKE', lambda: (like.count(), list(like[:10]))),
+            ('FTS5', lambda: self.fts(query)),
+        )
+        for title, search in runs:
+            timings = []
+            for _ in range(repeat):
+                started = time.perf_counter()
+                found, _ = search()
+                timings.append(time.perf_counter() - started)
+            best = min(timings) * 1000
+            self.stdout.write(
+                f'{title}: найдено {found}, лучшее время {best:.1f} мс'
+            )
+
+    @staticmethod
+    def fts(query):
+        results = SearchResults(query)
+        return results.count(), results[:10]
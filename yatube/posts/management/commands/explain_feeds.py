@@ -0,0 +1,70 @@
+from contextlib import suppress
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.core.paginator import EmptyPage
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+
+from posts.models import Post
+from posts.utils import CursorPaginator, encode_cursor
+
+
+class Command(BaseCommand):
+    help = (
+        'Выводит EXPLAIN QUERY PLAN для запросов лент и завершается '
+        'с ошибкой, если какой-то из них сканирует таблицу целиком '
+        'или сортирует во временном B-дереве.'
+    )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда поддерживает только SQLite')
+        problems = []
+        for name, sql in self.feed_queries():
+            plan = self.explain(sql)
+            self.stdout.write(f'{name}: {sql}')
+            for step in plan:
+                self.stdout.write(f'    {step}')
+            problems.extend(
+                f'{name}: {step}' for step in plan if self.is_bad(step)
+            )
+        if problems:
+            raise CommandError(
+                'Запросы лент без подходящего индекса:\n'
+                + '\n'.join(problems)
+            )
+        self.stdout.write(self.style.SUCCESS('Все запросы лент по индексам'))
+
+    def feed_queries(self):
+        """Выполняет запросы каждой ленты так же, как это делают
+        представления, и возвращает их SQL."""
+        feeds = {
+            'index': Post.objects.for_feed(),
+            'group_posts': Post.objects.for_feed().filter(group_id=0),
+            'profile': Post.objects.for_feed().filter(author_id=0),
+        }
+        cursor = encode_cursor(timezone.now(), 0)
+        for name, posts in feeds.items():
+            paginator = CursorPaginator(posts, settings.POST_PER_PAGE)
+            with CaptureQueriesContext(connection) as queries:
+                paginator.count
+                list(posts[:paginator.per_page])
+                for page in (paginator.page_after, paginator.page_before):
+                    # Ленты пусты, нужен только SQL их запросов.
+                    with suppress(EmptyPage):
+                        page(cursor)
+            for query in queries.captured_queries:
+                yield name, query['sql']
+
+    @staticmethod
+    def explain(sql):
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}')
+            return [row[-1] for row in cursor.fetchall()]
+
+    @staticmethod
+    def is_bad(step):
+        full_scan = step.startswith('SCAN') and 'INDEX' not in step
+        return full_scan or 'TEMP B-TREE' in step
@@ -0,0 +1,54 @@
+import gzip
+import sys
+from contextlib import nullcontext
+
+from django.core.management.base import BaseCommand
+
+from posts.export import CHUNK_SIZE, FORMATS, export_lines
+
+
+class Command(BaseCommand):
+    help = (
+        'Выгружает посты с именем автора и slug группы в JSONL или CSV. '
+        'Строки читаются и пишутся по мере выборки, без загрузки '
+        'всей таблицы в память.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл или «-» для stdout')
+        parser.add_argument('--format', choices=FORMATS)
+        parser.add_argument(
+            '--gzip',
+            action='store_true',
+            help='Сжать вывод; для файлов *.gz включается само'
+        )
+        parser.add_argument('--chunk-size', type=int, default=CHUNK_SIZE)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        compress = options['gzip'] or path.endswith('.gz')
+        file_format = options['format']
+        if file_format is None:
+            name = path[:-len('.gz')] if path.endswith('.gz') else path
+            file_format = 'csv' if name.endswith('.csv') else 'jsonl'
+        lines = export_lines(file_format, chunk_size=options['chunk_size'])
+        total = 0
+        with self.open(path, compress) as stream:
+            for line in lines:
+                stream.write(line)
+                total += 1
+        if file_format == 'csv':
+            total -= 1
+        self.stderr.write(f'Выгружено постов: {total}')
+
+    @staticmethod
+    def open(path, compress):
+        if path != '-':
+            opener = gzip.open if compress else open
+            return opener(path, 'wt', encoding='utf-8', newline='')
+        if compress:
+            # GzipFile не закрывает поток, который ему передали.
+            return gzip.open(
+                sys.stdout.buffer, 'wt', encoding='utf-8', newline=''
+            )
+        return nullcontext(sys.stdout)
@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from posts import cache as feed_cache
+
+
+class Command(BaseCommand):
+    help = 'Показывает попадания и промахи кэша страниц лент.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Обнулить счётчики после вывода',
+        )
+
+    def handle(self, *args, **options):
+        stats = feed_cache.stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total if total else 0
+        self.stdout.write(
+            f'hits: {stats["hits"]}, misses: {stats["misses"]}, '
+            f'hit ratio: {ratio:.1%}'
+        )
+        if options['reset']:
+            feed_cache.reset_stats()
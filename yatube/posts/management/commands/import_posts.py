@@ -0,0 +1,254 @@
+import csv
+import gzip
+import json
+import os
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts import cache as feed_cache
+from posts import timeline
+from posts.models import Follow, Group, Post, User
+from posts.search import search_index_suspended
+
+# Столько значений SQLite принимает в одном запросе.
+LOOKUP_CHUNK = 500
+# Кэш страниц SQLite на время загрузки: страницы индексов posts_post
+# остаются в памяти между пачками. Отрицательное значение — в КиБ.
+IMPORT_CACHE_SIZE = -256 * 2 ** 10
+
+
+def chunks(iterable, size):
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
+
+
+def read_jsonl(stream):
+    """Записи JSONL; на строку, которая не объект JSON, — ValueError
+    с её номером в файле."""
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except ValueError as error:
+            raise ValueError(f'строка {number}: {error}')
+        if not isinstance(record, dict):
+            raise ValueError(f'строка {number}: ожидался объект JSON')
+        yield record
+
+
+@contextmanager
+def import_pragmas():
+    """WAL и synchronous=OFF на время загрузки: SQLite не ждёт
+    fsync после каждой транзакции. Внутри внешней транзакции
+    режим журнала не меняется, остаётся только кэш страниц.
+    После загрузки настройки возвращаются к прежним."""
+    if connection.vendor != 'sqlite':
+        yield
+        return
+    pragmas = {'cache_size': IMPORT_CACHE_SIZE}
+    if not connection.in_atomic_block:
+        pragmas['synchronous'] = 0
+    with connection.cursor() as cursor:
+        saved = {}
+        for name in pragmas:
+            cursor.execute(f'PRAGMA {name}')
+            saved[name] = cursor.fetchone()[0]
+        if not connection.in_atomic_block:
+            cursor.execute('PRAGMA journal_mode=WAL')
+        for name, value in pragmas.items():
+            cursor.execute(f'PRAGMA {name}={int(value)}')
+    try:
+        yield
+    finally:
+        with connection.cursor() as cursor:
+            for name, value in saved.items():
+                cursor.execute(f'PRAGMA {name}={int(value)}')
+
+
+def insert_sql(model, fields):
+    """INSERT на одну строку для executemany. Модели при этом
+    не создаются: на миллионе строк сборка объектов и компиляция
+    bulk_create занимают больше времени, чем сама запись."""
+    columns = ', '.join(
+        connection.ops.quote_name(model._meta.get_field(name).column)
+        for name in fields
+    )
+    placeholders = ', '.join(['%s'] * len(fields))
+    return (
+        f'INSERT INTO {connection.ops.quote_name(model._meta.db_table)} '
+        f'({columns}) VALUES ({placeholders})'
+    )
+
+
+class Command(BaseCommand):
+    help = (
+        'Загружает посты из JSONL или CSV с полями text, author, '
+        'group и pub_date. Недостающие пользователи и группы создаются. '
+        'Каждая пачка строк записывается в своей транзакции.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='Файл, в том числе *.gz, или «-» для stdin'
+        )
+        parser.add_argument('--format', choices=('jsonl', 'csv'))
+        parser.add_argument('--batch-size', type=int, default=20_000)
+
+    def handle(self, *args, **options):
+        path = options['path']
+        file_format = options['format']
+        compressed = path.endswith('.gz')
+        if file_format is None:
+            name = path[:-len('.gz')] if compressed else path
+            extension = os.path.splitext(name)[1].lstrip('.')
+            file_format = 'csv' if extension == 'csv' else 'jsonl'
+        if path == '-':
+            self.load(sys.stdin, file_format, options['batch_size'])
+            return
+        opener = gzip.open if compressed else open
+        with opener(path, 'rt', encoding='utf-8', newline='') as stream:
+            self.load(stream, file_format, options['batch_size'])
+
+    def load(self, stream, file_format, batch_size):
+        records = (
+            csv.DictReader(stream) if file_format == 'csv'
+            else read_jsonl(stream)
+        )
+        self.authors = dict(User.objects.values_list('username', 'id'))
+        self.groups = dict(Group.objects.values_list('slug', 'id'))
+        self.touched_authors = set()
+        self.touched_groups = set()
+        self.now = self.adapt_date(timezone.now())
+        self.sql = insert_sql(
+            Post, ('text', 'pub_date', 'edited', 'author', 'group', 'image')
+        )
+        total = 0
+        started = time.perf_counter()
+        try:
+            with import_pragmas(), search_index_suspended():
+                for batch in chunks(records, batch_size):
+                    with transaction.atomic():
+                        self.save_batch(batch, first_row=total + 1)
+                    total += len(batch)
+                    self.report(total, started)
+        except (ValueError, KeyError) as error:
+            raise CommandError(
+                f'Ошибка в данных, загружено строк: {total}: {error!r}'
+            )
+        finally:
+            # Уже записанные пачки остаются в базе и должны
+            # попасть в счётчики и ленты.
+            self.finish()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Импортировано постов: {total} за {elapsed:.1f} с '
+            f'({total / max(elapsed, 1e-9):.0f} строк/с)'
+        ))
+
+    def save_batch(self, batch, first_row):
+        self.create_missing(
+            {record['author'] for record in batch},
+            self.authors,
+            User,
+            'username',
+            lambda username: User(username=username, password='!')
+        )
+        self.create_missing(
+            {record['group'] for record in batch if record.get('group')},
+            self.groups,
+            Group,
+            'slug',
+            lambda slug: Group(slug=slug, title=slug, description='')
+        )
+        rows = []
+        for row, record in enumerate(batch, first_row):
+            if not record.get('text'):
+                raise ValueError(f'строка {row}: пустой text')
+            author_id = self.authors[record['author']]
+            group_id = self.groups.get(record.get('group'))
+            pub_date = self.pub_date(record.get('pub_date'))
+            rows.append((
+                record['text'],
+                pub_date,
+                pub_date,
+                author_id,
+                group_id,
+                '',
+            ))
+            self.touched_authors.add(author_id)
+            if group_id:
+                self.touched_groups.add(group_id)
+        with connection.cursor() as cursor:
+            cursor.executemany(self.sql, rows)
+
+    def pub_date(self, value):
+        if not value:
+            return self.now
+        try:
+            pub_date = datetime.fromisoformat(value)
+        except ValueError:
+            pub_date = parse_datetime(value)
+        if pub_date is None:
+            raise ValueError(f'некорректная дата {value!r}')
+        return self.adapt_date(pub_date)
+
+    @staticmethod
+    def adapt_date(value):
+        if timezone.is_naive(value):
+            value = timezone.make_aware(value)
+        if connection.vendor == 'sqlite' and settings.USE_TZ:
+            # То же, что adapt_datetimefield_value: UTC без зоны,
+            # но без pytz, который на миллионе строк заметен.
+            return str(value.replace(tzinfo=None) - value.utcoffset())
+        return connection.ops.adapt_datetimefield_value(value)
+
+    @staticmethod
+    def create_missing(keys, known, model, field, build):
+        missing = keys - known.keys()
+        if not missing:
+            return
+        model.objects.bulk_create(build(key) for key in missing)
+        for chunk in chunks(missing, LOOKUP_CHUNK):
+            known.update(
+                model.objects.filter(**{f'{field}__in': chunk})
+                .values_list(field, 'id')
+            )
+
+    def report(self, total, started):
+        rate = total / max(time.perf_counter() - started, 1e-9)
+        self.stdout.write(f'{total} строк, {rate:.0f} строк/с')
+
+    def finish(self):
+        """Делает то, что при обычном сохранении поста делают сигналы:
+        счётчики, ленты подписчиков и поколения кэша лент."""
+        call_command('rebuild_counters', stdout=self.stdout)
+        followed = set(
+            Follow.objects.values_list('author_id', flat=True).distinct()
+        )
+        for author_id in followed & self.touched_authors:
+            if not timeline.is_popular(author_id):
+                timeline.backfill(
+                    author_id,
+                    Follow.objects.filter(
+                        author_id=author_id
+                    ).values_list('user_id', flat=True)
+                )
+        feed_cache.bump_version(feed_cache.INDEX)
+        for author_id in self.touched_authors:
+            feed_cache.bump_version(feed_cache.AUTHOR, author_id)
+        for group_id in self.touched_groups:
+            feed_cache.bump_version(feed_cache.GROUP, group_id)
@@ -0,0 +1,49 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from posts.models import Comment, Counter, Follow, Post
+
+
+class Command(BaseCommand):
+    help = 'Пересчитывает счётчики постов, комментариев и подписчиков.'
+
+    def handle(self, *args, **options):
+        counters = [Counter(scope=Counter.TOTAL, value=Post.objects.count())]
+        counters.extend(
+            Counter(scope=Counter.AUTHOR, object_id=author_id, value=value)
+            for author_id, value in self.grouped('author_id')
+        )
+        counters.extend(
+            Counter(scope=Counter.GROUP, object_id=group_id, value=value)
+            for group_id, value in self.grouped('group_id')
+            if group_id is not None
+        )
+        counters.extend(
+            Counter(scope=Counter.COMMENTS, object_id=post_id, value=value)
+            for post_id, value in self.grouped('post_id', Comment)
+        )
+        counters.extend(
+            Counter(scope=Counter.FOLLOWERS, object_id=author_id, value=value)
+            for author_id, value in self.grouped('author_id', Follow)
+        )
+        with transaction.atomic():
+            Counter.objects.filter(
+                scope__in=(
+                    Counter.TOTAL,
+                    Counter.AUTHOR,
+                    Counter.GROUP,
+                    Counter.COMMENTS,
+                    Counter.FOLLOWERS,
+                )
+            ).delete()
+            Counter.objects.bulk_create(counters, batch_size=500)
+        self.stdout.write(
+            self.style.SUCCESS(f'Пересчитано счётчиков: {len(counters)}')
+        )
+
+    @staticmethod
+    def grouped(field, model=Post):
+        return model.objects.order_by().values(field).annotate(
+            value=Count('id')
+        ).values_list(field, 'value')
@@ -0,0 +1,112 @@
+import os
+import time
+from multiprocessing import Pool
+
+import django
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections, connections
+from sorl.thumbnail import default
+from sorl.thumbnail.conf import settings as thumbnail_settings
+
+from posts import thumbnails
+from posts.models import Post
+
+
+def warm_image(image_name):
+    """Создаёт миниатюры одной картинки в процессе пула."""
+    try:
+        thumbnails.generate(image_name)
+    finally:
+        close_old_connections()
+    return image_name
+
+
+class Command(BaseCommand):
+    help = (
+        'Создаёт недостающие миниатюры картинок постов (warm) '
+        'и удаляет файлы миниатюр, которым не соответствует ни одна '
+        'картинка поста (prune).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'action',
+            nargs='?',
+            choices=('warm', 'prune', 'all'),
+            default='all',
+        )
+        parser.add_argument(
+            '--processes',
+            type=int,
+            default=os.cpu_count(),
+            help='Размер пула процессов, по умолчанию — число CPU',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Только показать, что будет удалено',
+        )
+
+    def handle(self, *args, **options):
+        images = list(
+            Post.objects.exclude(image='').order_by().values_list(
+                'image', flat=True
+            ).distinct()
+        )
+        if options['action'] in ('warm', 'all'):
+            self.warm(images, options['processes'])
+        if options['action'] in ('prune', 'all'):
+            self.prune(images, options['dry_run'])
+
+    def warm(self, images, processes):
+        missing = [
+            name for name in images
+            if not all(
+                default.storage.exists(thumbnails.thumbnail_name(name, alias))
+                for alias in settings.POST_THUMBNAILS
+            )
+        ]
+        start = time.perf_counter()
+        if processes > 1 and len(missing) > 1:
+            # Соединения с базой не должны переходить в дочерние процессы.
+            connections.close_all()
+            with Pool(processes, initializer=django.setup) as pool:
+                for _ in pool.imap_unordered(warm_image, missing, 8):
+                    pass
+        else:
+            for name in missing:
+                warm_image(name)
+        seconds = time.perf_counter() - start
+        rate = len(missing) / seconds if seconds else 0
+        self.stdout.write(
+            f'Картинок: {len(images)}, без миниатюр: {len(missing)}, '
+            f'создано за {seconds:.2f} с ({rate:.1f} картинок/с)'
+        )
+
+    def prune(self, images, dry_run):
+        expected = {
+            thumbnails.thumbnail_name(name, alias)
+            for name in images
+            for alias in settings.POST_THUMBNAILS
+        }
+        root = default.storage.path(thumbnail_settings.THUMBNAIL_PREFIX)
+        removed = reclaimed = 0
+        for dirpath, _, filenames in os.walk(root, topdown=False):
+            for filename in filenames:
+                path = os.path.join(dirpath, filename)
+                name = os.path.relpath(path, settings.MEDIA_ROOT)
+                if name.replace(os.sep, '/') in expected:
+                    continue
+                removed += 1
+                reclaimed += os.path.getsize(path)
+                if not dry_run:
+                    os.remove(path)
+            if not dry_run and dirpath != root and not os.listdir(dirpath):
+                os.rmdir(dirpath)
+        if not dry_run:
+            default.kvstore.cleanup()
+        self.stdout.write(
+            f'Удалено файлов: {removed}, освобождено: {reclaimed} байт'
+            + (' (dry run)' if dry_run else '')
+        )
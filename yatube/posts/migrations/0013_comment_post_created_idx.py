@@ -0,0 +1,24 @@
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0012_post_search_index'),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name='comment',
+            options={'ordering': ('-created',), 'verbose_name': 'comment', 'verbose_name_plural': 'comments'},
+        ),
+        migrations.AddIndex(
+            model_name='comment',
+            index=models.Index(fields=['post', '-created', '-id'], name='comment_post_created_idx'),
+        ),
+        migrations.AlterField(
+            model_name='counter',
+            name='scope',
+            field=models.CharField(choices=[('total', 'Все посты'), ('author', 'Посты автора'), ('group', 'Посты группы'), ('comments', 'Комментарии поста')], max_length=16, verbose_name='Что считаем'),
+        ),
+    ]
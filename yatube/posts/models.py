@@ -1,4 +1,5 @@
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth import get_user_model
 
 User = get_user_model()
@@ -28,6 +29,24 @@ class Group(models.Model):
         return self.title
 
 
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        """Посты для лент: автор и группа одним запросом,
+        только те колонки, которые выводятся в шаблонах,
+        и однозначный порядок (дата, id) для паджинации по курсору."""
+        return self.select_related('author', 'group').only(
+            'id',
+            'text',
+            'pub_date',
+            'edited',
+            'author__username',
+            'author__first_name',
+            'author__last_name',
+            'group__slug',
+            'group__title',
+        ).order_by('-pub_date', '-id')
+
+
 class Post(models.Model):
     text = models.TextField(
         verbose_name='Текст поста',
@@ -36,6 +55,10 @@ class Post(models.Model):
         auto_now_add=True,
         verbose_name='Дата публикации'
     )
+    edited = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Дата изменения'
+    )
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -57,10 +80,271 @@ class Post(models.Model):
         blank=True
     )
 
+    objects = PostQuerySet.as_manager()
+
     class Meta:
         ordering = ('-pub_date',)
+        indexes = (
+            models.Index(
+                fields=('-pub_date', '-id'),
+                name='post_pub_date_idx'
+            ),
+            models.Index(
+                fields=('author', '-pub_date', '-id'),
+                name='post_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=('group', '-pub_date', '-id'),
+                name='post_group_pub_date_idx'
+            ),
+        )
         verbose_name = 'post'
         verbose_name_plural = 'posts'
 
     def __str__(self):
         return self.text[:15]
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Исходные значения полей нужны сигналам, чтобы при сохранении
+        # понять, что именно изменилось.
+        instance._loaded_values = dict(zip(field_names, values))
+        return instance
+
+
+class CommentQuerySet(models.QuerySet):
+    def for_post(self, post_id):
+        """Комментарии поста от новых к старым вместе с авторами
+        в порядке индекса (post, -created, -id)."""
+        return self.filter(post_id=post_id).select_related('author').only(
+            'id',
+            'text',
+            'created',
+            'post_id',
+            'author__username',
+            'author__first_name',
+            'author__last_name',
+        ).order_by('-created', '-id')
+
+
+class Comment(models.Model):
+    text = models.TextField(
+        verbose_name='Текст комментария',
+        help_text='Введите текст комментария'
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Дата публикации комментария'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='comments',
+        verbose_name='Автор комментария'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='comments'
+    )
+
+    objects = CommentQuerySet.as_manager()
+
+    class Meta:
+        ordering = ('-created',)
+        indexes = (
+            models.Index(
+                fields=('post', '-created', '-id'),
+                name='comment_post_created_idx'
+            ),
+        )
+        verbose_name = 'comment'
+        verbose_name_plural = 'comments'
+
+    def __str__(self):
+        return self.text[:15]
+
+
+class Follow(models.Model):
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='follower',
+        verbose_name='Подписчик'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='following',
+        verbose_name='Автор'
+    )
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'author'),
+                name='unique_follow'
+            ),
+            models.CheckConstraint(
+                check=~models.Q(user=models.F('author')),
+                name='prevent_self_follow'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('author', 'user'),
+                name='follow_author_user_idx'
+            ),
+        )
+        verbose_name = 'follow'
+        verbose_name_plural = 'follows'
+
+    def __str__(self):
+        return f'{self.user_id} -> {self.author_id}'
+
+
+class TimelineEntry(models.Model):
+    """Пост в ленте подписок пользователя. Записи добавляются
+    при публикации поста, дата и автор скопированы из поста,
+    чтобы лента читалась по одному индексу без соединений."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='timeline',
+        verbose_name='Читатель'
+    )
+    post = models.ForeignKey(
+        Post,
+        on_delete=models.CASCADE,
+        related_name='timeline_entries',
+        verbose_name='Пост'
+    )
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='+',
+        verbose_name='Автор поста'
+    )
+    pub_date = models.DateTimeField(verbose_name='Дата публикации')
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('user', 'post'),
+                name='unique_timeline_entry'
+            ),
+        )
+        indexes = (
+            models.Index(
+                fields=('user', '-pub_date', '-post'),
+                name='timeline_user_pub_date_idx'
+            ),
+            models.Index(
+                fields=('author', 'user'),
+                name='timeline_author_user_idx'
+            ),
+        )
+        verbose_name = 'timeline entry'
+        verbose_name_plural = 'timeline entries'
+
+    def __str__(self):
+        return f'{self.user_id}: {self.post_id}'
+
+
+class CounterQuerySet(models.QuerySet):
+    def value(self, scope, object_id=0):
+        """Значение счётчика. Отсутствующий счётчик один раз
+        считается по базе и сохраняется."""
+        value = self.filter(
+            scope=scope,
+            object_id=object_id
+        ).values_list('value', flat=True).first()
+        if value is None:
+            value = Counter.source(scope, object_id).count()
+            self.get_or_create(
+                scope=scope,
+                object_id=object_id,
+                defaults={'value': value}
+            )
+        return value
+
+    def add(self, scope, object_id=0, delta=1):
+        """Сдвигает существующий счётчик на delta."""
+        self.filter(
+            scope=scope,
+            object_id=object_id
+        ).update(value=models.F('value') + delta, modified=timezone.now())
+
+    def touch(self, *keys):
+        """Отмечает, что объекты под счётчиками (scope, object_id)
+        изменились, хотя их число осталось прежним."""
+        condition = models.Q()
+        for scope, object_id in keys:
+            condition |= models.Q(scope=scope, object_id=object_id)
+        self.filter(condition).update(modified=timezone.now())
+
+
+class Counter(models.Model):
+    """Денормализованное число объектов, чтобы не считать COUNT(*)
+    на каждой странице."""
+    TOTAL = 'total'
+    AUTHOR = 'author'
+    GROUP = 'group'
+    COMMENTS = 'comments'
+    FOLLOWERS = 'followers'
+    SCOPES = (
+        (TOTAL, 'Все посты'),
+        (AUTHOR, 'Посты автора'),
+        (GROUP, 'Посты группы'),
+        (COMMENTS, 'Комментарии поста'),
+        (FOLLOWERS, 'Подписчики автора'),
+    )
+
+    scope = models.CharField(
+        max_length=16,
+        choices=SCOPES,
+        verbose_name='Что считаем'
+    )
+    object_id = models.PositiveIntegerField(
+        default=0,
+        verbose_name='id объекта'
+    )
+    value = models.IntegerField(
+        default=0,
+        verbose_name='Значение'
+    )
+    # Время последнего изменения посчитанных объектов: по нему
+    # и значению ленты отвечают на условные GET.
+    modified = models.DateTimeField(
+        auto_now=True,
+        verbose_name='Изменён'
+    )
+
+    objects = CounterQuerySet.as_manager()
+
+    class Meta:
+        constraints = (
+            models.UniqueConstraint(
+                fields=('scope', 'object_id'),
+                name='unique_counter'
+            ),
+        )
+        verbose_name = 'counter'
+        verbose_name_plural = 'counters'
+
+    def __str__(self):
+        return f'{self.scope}:{self.object_id}={self.value}'
+
+    @staticmethod
+    def source(scope, object_id=0):
+        """Queryset, по которому считается счётчик."""
+        if scope == Counter.AUTHOR:
+            return Post.objects.filter(author_id=object_id)
+        if scope == Counter.GROUP:
+            return Post.objects.filter(group_id=object_id)
+        if scope == Counter.COMMENTS:
+            return Comment.objects.filter(post_id=object_id)
+        if scope == Counter.FOLLOWERS:
+            return Follow.objects.filter(author_id=object_id)
+        return Post.objects.all()
@@ -0,0 +1,160 @@
+"""Полнотекстовый поиск по постам на SQLite FTS5.
+
+Таблица posts_post_fts хранит только индекс (content='posts_post'),
+а триггеры держат его в согласии с posts_post при любых изменениях,
+в том числе при bulk_create и правке через SQL.
+"""
+from contextlib import contextmanager
+
+from django.db import connection
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Post
+
+SNIPPET_START = '\x02'
+SNIPPET_END = '\x03'
+SNIPPET_TOKENS = 24
+
+SEARCH_TRIGGERS = (
+    'posts_post_fts_insert',
+    'posts_post_fts_delete',
+    'posts_post_fts_update',
+)
+
+SEARCH_INDEX_SQL = (
+    """
+    CREATE VIRTUAL TABLE IF NOT EXISTS posts_post_fts USING fts5(
+        text, content='posts_post', content_rowid='id'
+    )
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_post_fts_insert
+    AFTER INSERT ON posts_post BEGIN
+        INSERT INTO posts_post_fts(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_post_fts_delete
+    AFTER DELETE ON posts_post BEGIN
+        INSERT INTO posts_post_fts(posts_post_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+    END
+    """,
+    """
+    CREATE TRIGGER IF NOT EXISTS posts_post_fts_update
+    AFTER UPDATE OF text ON posts_post BEGIN
+        INSERT INTO posts_post_fts(posts_post_fts, rowid, text)
+        VALUES ('delete', old.id, old.text);
+        INSERT INTO posts_post_fts(rowid, text) VALUES (new.id, new.text);
+    END
+    """,
+)
+
+
+def ensure_search_index(using=connection):
+    """Создаёт таблицу индекса и триггеры, если их нет.
+
+    SQLite теряет триггеры, когда миграция пересоздаёт posts_post,
+    поэтому функция вызывается и после каждой миграции.
+    """
+    if using.vendor != 'sqlite':
+        return
+    with using.cursor() as cursor:
+        for sql in SEARCH_INDEX_SQL:
+            cursor.execute(sql)
+
+
+def rebuild_search_index(using=connection):
+    with using.cursor() as cursor:
+        cursor.execute(
+            "INSERT INTO posts_post_fts(posts_post_fts) VALUES ('rebuild')"
+        )
+
+
+@contextmanager
+def search_index_suspended(using=connection):
+    """Снимает триггеры индекса на время массовой загрузки
+    и перестраивает индекс целиком после неё: одна перестройка
+    быстрее, чем обновление индекса на каждую строку."""
+    if using.vendor != 'sqlite':
+        yield
+        return
+    with using.cursor() as cursor:
+        for trigger in SEARCH_TRIGGERS:
+            cursor.execute(f'DROP TRIGGER IF EXISTS {trigger}')
+    try:
+        yield
+    finally:
+        ensure_search_index(using)
+        rebuild_search_index(using)
+
+
+def match_expression(query):
+    """Каждое слово запроса — отдельная фраза в кавычках, чтобы
+    пользовательский ввод не разбирался как синтаксис FTS5."""
+    return ' '.join(
+        '"{}"'.format(word.replace('"', '""')) for word in query.split()
+    )
+
+
+def highlight(snippet):
+    return mark_safe(
+        escape(snippet)
+        .replace(SNIPPET_START, '<mark>')
+        .replace(SNIPPET_END, '</mark>')
+    )
+
+
+class SearchResults:
+    """Найденные посты в порядке релевантности (bm25).
+
+    Поддерживает count() и срезы, поэтому её можно отдать Paginator:
+    каждая страница — один запрос к индексу и один за постами.
+    """
+
+    def __init__(self, query):
+        self.match = match_expression(query)
+
+    def count(self):
+        if not self.match:
+            return 0
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT count(*) FROM posts_post_fts '
+                'WHERE posts_post_fts MATCH %s',
+                [self.match],
+            )
+            return cursor.fetchone()[0]
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, item):
+        if not isinstance(item, slice):
+            return self[item:item + 1][0]
+        start = item.start or 0
+        limit = item.stop - start if item.stop is not None else -1
+        if not self.match or limit == 0:
+            return []
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT rowid, snippet(posts_post_fts, 0, %s, %s, %s, %s) '
+                'FROM posts_post_fts WHERE posts_post_fts MATCH %s '
+                'ORDER BY rank LIMIT %s OFFSET %s',
+                [
+                    SNIPPET_START, SNIPPET_END, '…', SNIPPET_TOKENS,
+                    self.match, limit, start,
+                ],
+            )
+            snippets = cursor.fetchall()
+        posts = Post.objects.for_feed().in_bulk(
+            [post_id for post_id, _ in snippets]
+        )
+        results = []
+        for post_id, snippet in snippets:
+            post = posts.get(post_id)
+            if post is not None:
+                post.snippet = highlight(snippet)
+                results.append(post)
+        return results
@@ -0,0 +1,126 @@
+from django.conf import settings
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from . import cache as feed_cache
+from . import thumbnails, timeline
+from .models import Comment, Counter, Follow, Group, Post, User
+
+
+def loaded_value(instance, field):
+    """Значение поля на момент загрузки из базы или None."""
+    return getattr(instance, '_loaded_values', {}).get(field)
+
+
+def count_post(post, delta):
+    Counter.objects.add(Counter.TOTAL, delta=delta)
+    Counter.objects.add(Counter.AUTHOR, post.author_id, delta)
+    if post.group_id:
+        Counter.objects.add(Counter.GROUP, post.group_id, delta)
+
+
+def feed_counters(post):
+    yield Counter.TOTAL, 0
+    yield Counter.AUTHOR, post.author_id
+    if post.group_id:
+        yield Counter.GROUP, post.group_id
+
+
+@receiver(post_save, sender=Post)
+def post_saved(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    old_group_id = None
+    if created:
+        count_post(instance, 1)
+        if timeline.needs_fan_out(instance.author_id):
+            timeline.schedule(timeline.fan_out_post, instance.pk)
+    else:
+        old_group_id = loaded_value(instance, 'group_id')
+        if old_group_id != instance.group_id:
+            if old_group_id:
+                Counter.objects.add(Counter.GROUP, old_group_id, -1)
+            if instance.group_id:
+                Counter.objects.add(Counter.GROUP, instance.group_id)
+        Counter.objects.touch(*feed_counters(instance))
+    feed_cache.invalidate_post(instance, old_group_id)
+    image_name = instance.image.name
+    if image_name and image_name != loaded_value(instance, 'image'):
+        thumbnails.schedule(image_name)
+    instance._loaded_values = {
+        **getattr(instance, '_loaded_values', {}),
+        'group_id': instance.group_id,
+        'image': image_name,
+    }
+
+
+@receiver(post_delete, sender=Post)
+def post_deleted(sender, instance, **kwargs):
+    count_post(instance, -1)
+    Counter.objects.filter(
+        scope=Counter.COMMENTS,
+        object_id=instance.pk
+    ).delete()
+    feed_cache.invalidate_post(instance)
+
+
+@receiver(post_save, sender=Comment)
+def comment_saved(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        Counter.objects.add(Counter.COMMENTS, instance.post_id)
+
+
+@receiver(post_delete, sender=Comment)
+def comment_deleted(sender, instance, **kwargs):
+    Counter.objects.add(Counter.COMMENTS, instance.post_id, -1)
+
+
+@receiver(post_save, sender=Follow)
+def follow_saved(sender, instance, created, raw=False, **kwargs):
+    if raw or not created:
+        return
+    Counter.objects.add(Counter.FOLLOWERS, instance.author_id)
+    if not timeline.is_popular(instance.author_id):
+        timeline.backfill(instance.author_id, [instance.user_id])
+
+
+@receiver(post_delete, sender=Follow)
+def follow_deleted(sender, instance, **kwargs):
+    Counter.objects.add(Counter.FOLLOWERS, instance.author_id, -1)
+    timeline.remove(instance.author_id, instance.user_id)
+    followers = Counter.objects.value(Counter.FOLLOWERS, instance.author_id)
+    if followers == settings.FOLLOW_FANOUT_LIMIT:
+        # Автор перестал быть популярным: его посты, которые
+        # не раскладывались по лентам, нужно туда вернуть.
+        timeline.schedule(
+            timeline.backfill_followers, instance.author_id
+        )
+
+
+@receiver(post_save, sender=Group)
+def group_saved(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    feed_cache.bump_version(feed_cache.INDEX)
+    feed_cache.bump_version(feed_cache.GROUP, instance.pk)
+
+
+@receiver(post_delete, sender=Group)
+def group_deleted(sender, instance, **kwargs):
+    Counter.objects.filter(
+        scope=Counter.GROUP,
+        object_id=instance.pk
+    ).delete()
+    feed_cache.bump_version(feed_cache.INDEX)
+    feed_cache.bump_version(feed_cache.GROUP, instance.pk)
+
+
+@receiver(post_save, sender=User)
+def author_saved(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or update_fields == {'last_login'}:
+        return
+    # Имя автора выводится и на главной, и в группах его постов.
+    group_ids = Post.objects.filter(author_id=instance.pk).values_list(
+        'group_id', flat=True
+    ).distinct()
+    feed_cache.invalidate_author(instance.pk, list(group_ids))
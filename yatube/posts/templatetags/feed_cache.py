@@ -0,0 +1,39 @@
+from django import template
+
+from .. import cache as feed_cache
+
+register = template.Library()
+
+
+class FeedCacheNode(template.Node):
+    def __init__(self, nodelist, key):
+        self.nodelist = nodelist
+        self.key = key
+
+    def render(self, context):
+        key = self.key.resolve(context)
+        if not key:
+            return self.nodelist.render(context)
+        fragment = feed_cache.get_fragment(key)
+        if fragment is None:
+            fragment = self.nodelist.render(context)
+            feed_cache.set_fragment(key, fragment)
+        return fragment
+
+
+@register.tag
+def feedcache(parser, token):
+    """Кэширует фрагмент ленты под ключом из контекста:
+
+        {% feedcache feed_cache_key %} ... {% endfeedcache %}
+
+    Пустой ключ отключает кэширование.
+    """
+    bits = token.split_contents()
+    if len(bits) != 2:
+        raise template.TemplateSyntaxError(
+            f'{bits[0]} принимает ровно один аргумент — ключ'
+        )
+    nodelist = parser.parse(('endfeedcache',))
+    parser.delete_first_token()
+    return FeedCacheNode(nodelist, parser.compile_filter(bits[1]))
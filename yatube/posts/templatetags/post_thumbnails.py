@@ -0,0 +1,16 @@
+from django import template
+
+from .. import thumbnails
+
+register = template.Library()
+
+
+@register.filter
+def thumbnail_url(image, alias):
+    """URL заранее созданной миниатюры или исходной картинки:
+
+    {{ post.image|thumbnail_url:'detail' }}
+    """
+    if not image:
+        return ''
+    return thumbnails.thumbnail_url(image, alias)
@@ -0,0 +1,123 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from .. import cache as feed_cache
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class FeedCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.author = User.objects.create_user(username='author')
+        cls.other_author = User.objects.create_user(username='other')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-slug',
+        )
+        Post.objects.create(author=cls.author, text='Тест', group=cls.group)
+        Post.objects.create(
+            author=cls.other_author,
+            text='Другой тест',
+            group=cls.other_group,
+        )
+        cls.index = reverse('posts:index')
+        cls.group_page = reverse('posts:group_posts', args=(cls.group.slug,))
+        cls.other_group_page = reverse(
+            'posts:group_posts',
+            args=(cls.other_group.slug,)
+        )
+        cls.profile = reverse('posts:profile', args=(cls.author.username,))
+        cls.other_profile = reverse(
+            'posts:profile',
+            args=(cls.other_author.username,)
+        )
+
+    def setUp(self):
+        cache.clear()
+
+    def warm(self, *pages):
+        for page in pages:
+            self.client.get(page)
+        feed_cache.reset_stats()
+
+    def test_repeated_request_served_from_cache(self):
+        """Повторный запрос страницы ленты берётся из кэша
+        без запроса постов: остаются валидатор и счётчик."""
+        self.client.get(self.index)
+
+        with self.assertNumQueries(2):
+            response = self.client.get(self.index)
+
+        self.assertContains(response, 'Другой тест')
+        self.assertEqual(feed_cache.stats(), {'hits': 1, 'misses': 1})
+
+    def test_new_post_evicts_only_affected_feeds(self):
+        """Новый пост сбрасывает ленты своего автора и группы
+        и первую страницу главной, остальные остаются в кэше."""
+        pages = (
+            self.index,
+            self.group_page,
+            self.profile,
+            self.other_group_page,
+            self.other_profile,
+        )
+        self.warm(*pages)
+
+        Post.objects.create(
+            author=self.author,
+            text='Свежий пост',
+            group=self.group,
+        )
+        responses = [self.client.get(page) for page in pages]
+
+        for response in responses[:3]:
+            self.assertContains(response, 'Свежий пост')
+        self.assertEqual(feed_cache.stats(), {'hits': 2, 'misses': 3})
+
+    def test_moved_post_evicts_old_group(self):
+        """Перенос поста в другую группу сбрасывает обе группы."""
+        self.warm(self.group_page, self.other_group_page)
+        post = Post.objects.get(text='Тест')
+
+        post.group = self.other_group
+        post.save()
+        response = self.client.get(self.group_page)
+
+        self.assertNotContains(response, 'Тест</p>')
+        self.assertEqual(feed_cache.stats(), {'hits': 0, 'misses': 1})
+
+    def test_author_rename_evicts_feeds_with_author_posts(self):
+        """Новое имя автора видно на главной и в группах его постов,
+        чужая группа остаётся в кэше."""
+        pages = (self.index, self.group_page, self.other_group_page)
+        self.warm(*pages)
+
+        self.author.first_name = 'Лев'
+        self.author.last_name = 'Толстой'
+        self.author.save()
+        responses = [self.client.get(page) for page in pages]
+
+        for response in responses[:2]:
+            self.assertContains(response, 'Лев Толстой')
+        self.assertEqual(feed_cache.stats(), {'hits': 1, 'misses': 2})
+
+    @override_settings(CACHES={
+        'default': {
+            'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+        },
+    })
+    def test_feeds_work_without_cache(self):
+        """Ленты работают и с отключённым кэшем."""
+        for page in (self.index, self.group_page, self.profile):
+            with self.subTest(page=page):
+                response = self.client.get(page)
+                self.assertContains(response, 'Тест')
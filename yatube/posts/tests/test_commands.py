@@ -0,0 +1,114 @@
+import json
+import os
+import tempfile
+from datetime import datetime, timezone
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import CommandError, call_command
+from django.test import TestCase
+
+from ..models import Counter, Follow, Group, Post, TimelineEntry
+from ..search import SearchResults
+
+User = get_user_model()
+
+
+class ExplainFeedsCommandTest(TestCase):
+    def test_feed_queries_use_indexes(self):
+        """Запросы всех лент идут по индексам."""
+        out = StringIO()
+
+        call_command('explain_feeds', stdout=out)
+
+        self.assertIn('post_pub_date_idx', out.getvalue())
+        self.assertIn('post_group_pub_date_idx', out.getvalue())
+        self.assertIn('post_author_pub_date_idx', out.getvalue())
+
+
+class RebuildCountersCommandTest(TestCase):
+    def test_rebuild_counters_after_bulk_create(self):
+        """Команда восстанавливает счётчики после bulk_create,
+        который обходит сигналы."""
+        user = User.objects.create_user(username='auth')
+        Post.objects.create(author=user, text='Тестовый пост')
+        Counter.objects.value(Counter.AUTHOR, user.pk)
+        Post.objects.bulk_create(
+            Post(author=user, text=f'Test{num}') for num in range(5)
+        )
+        self.assertEqual(Counter.objects.value(Counter.AUTHOR, user.pk), 1)
+
+        call_command('rebuild_counters', stdout=StringIO())
+
+        self.assertEqual(Counter.objects.value(Counter.TOTAL), 6)
+        self.assertEqual(Counter.objects.value(Counter.AUTHOR, user.pk), 6)
+
+
+class ImportPostsCommandTest(TestCase):
+    def write(self, suffix, content):
+        fd, path = tempfile.mkstemp(suffix=suffix)
+        with os.fdopen(fd, 'w', encoding='utf-8') as stream:
+            stream.write(content)
+        self.addCleanup(os.remove, path)
+        return path
+
+    def test_import_jsonl_and_csv(self):
+        """Посты загружаются с датами из файла, недостающие авторы
+        и группы создаются, счётчики, поиск и ленты подписок
+        обновляются."""
+        reader = User.objects.create_user(username='reader')
+        author = User.objects.create_user(username='auth')
+        Follow.objects.create(user=reader, author=author)
+        records = [
+            {
+                'text': 'Первый импортированный',
+                'author': 'auth',
+                'group': 'imported',
+                'pub_date': '2020-01-02T03:04:05+00:00',
+            },
+            {'text': 'Второй импортированный', 'author': 'newcomer'},
+        ]
+        jsonl = self.write('.jsonl', ''.join(
+            json.dumps(record, ensure_ascii=False) + '\n'
+            for record in records
+        ))
+        csv = self.write(
+            '.csv', 'text,author,group,pub_date\nИз CSV,newcomer,,\n'
+        )
+
+        call_command('import_posts', jsonl, stdout=StringIO())
+        call_command('import_posts', csv, stdout=StringIO())
+
+        newcomer = User.objects.get(username='newcomer')
+        group = Group.objects.get(slug='imported')
+        first = Post.objects.get(text='Первый импортированный')
+        self.assertEqual(first.group, group)
+        self.assertEqual(
+            first.pub_date,
+            datetime(2020, 1, 2, 3, 4, 5, tzinfo=timezone.utc)
+        )
+        self.assertEqual(
+            Counter.objects.value(Counter.AUTHOR, newcomer.pk), 2
+        )
+        self.assertEqual(Counter.objects.value(Counter.TOTAL), 3)
+        self.assertEqual(SearchResults('импортированный').count(), 2)
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=reader, post=first).exists()
+        )
+
+    def test_invalid_record_stops_import(self):
+        path = self.write('.jsonl', '{"author": "auth"}\n')
+
+        with self.assertRaises(CommandError):
+            call_command('import_posts', path, stdout=StringIO())
+
+    def test_non_object_jsonl_line_reports_line_number(self):
+        for line in ('[1, 2]', '42', '"текст"', '{"text": '):
+            with self.subTest(line=line):
+                path = self.write(
+                    '.jsonl', '{"text": "Пост", "author": "auth"}\n\n'
+                    + line + '\n'
+                )
+
+                with self.assertRaisesMessage(CommandError, 'строка 3'):
+                    call_command('import_posts', path, stdout=StringIO())
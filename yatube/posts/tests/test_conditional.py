@@ -0,0 +1,137 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(username='author')
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        cls.other_group = Group.objects.create(title='Другая', slug='other')
+        cls.post = Post.objects.create(
+            author=cls.author, text='Пост', group=cls.group
+        )
+        cls.index = reverse('posts:index')
+        cls.group_page = reverse('posts:group_posts', args=(cls.group.slug,))
+        cls.profile = reverse('posts:profile', args=(cls.author.username,))
+        cls.detail = reverse('posts:post_detail', args=(cls.post.id,))
+
+    def setUp(self):
+        self.reader_client = Client()
+        self.reader_client.force_login(self.reader)
+
+    def get(self, url, client=None):
+        """Ответ после первого показа: недостающие счётчики
+        создаются при первом полном рендере."""
+        client = client or self.client
+        client.get(url)
+        return client.get(url)
+
+    def revalidate(self, url, client=None):
+        client = client or self.client
+        etag = self.get(url, client)['ETag']
+        return lambda: client.get(url, HTTP_IF_NONE_MATCH=etag).status_code
+
+    def test_unchanged_page_is_304_with_one_query(self):
+        for url in (self.index, self.group_page, self.profile, self.detail):
+            with self.subTest(url=url):
+                response = self.get(url)
+                self.assertTrue(response['ETag'].startswith('W/"'))
+                self.assertIn('Last-Modified', response)
+                self.assertIn('no-cache', response['Cache-Control'])
+
+                with self.assertNumQueries(1):
+                    response = self.client.get(
+                        url, HTTP_IF_NONE_MATCH=response['ETag']
+                    )
+                self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_if_modified_since(self):
+        last_modified = self.get(self.detail)['Last-Modified']
+
+        response = self.client.get(
+            self.detail, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+
+        self.assertEqual(response.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_post_changes_invalidate_feeds(self):
+        doomed = Post.objects.create(
+            author=self.author, text='Удалить', group=self.group
+        )
+        changes = {
+            'создание': lambda: Post.objects.create(
+                author=self.author, text='Новый', group=self.group
+            ),
+            'правка': lambda: self.post.save(),
+            'удаление': doomed.delete,
+        }
+        for name, change in changes.items():
+            checks = [
+                self.revalidate(url)
+                for url in (self.index, self.group_page, self.profile)
+            ]
+            change()
+            for check in checks:
+                with self.subTest(change=name):
+                    self.assertEqual(check(), HTTPStatus.OK)
+
+    def test_group_edit_invalidates_group_pages(self):
+        checks = [
+            self.revalidate(url)
+            for url in (self.index, self.group_page, self.detail)
+        ]
+
+        self.group.title = 'Новое название'
+        self.group.save()
+
+        for check in checks:
+            self.assertEqual(check(), HTTPStatus.OK)
+
+    def test_author_edit_invalidates_profile_and_post(self):
+        checks = [
+            self.revalidate(url) for url in (self.profile, self.detail)
+        ]
+
+        self.author.first_name = 'Лев'
+        self.author.save()
+
+        for check in checks:
+            self.assertEqual(check(), HTTPStatus.OK)
+
+    def test_other_group_post_keeps_group_page(self):
+        check = self.revalidate(self.group_page)
+
+        Post.objects.create(
+            author=self.reader, text='Другая группа', group=self.other_group
+        )
+
+        self.assertEqual(check(), HTTPStatus.NOT_MODIFIED)
+
+    def test_comment_invalidates_post_detail(self):
+        check = self.revalidate(self.detail)
+
+        Comment.objects.create(post=self.post, author=self.reader, text='Да')
+
+        self.assertEqual(check(), HTTPStatus.OK)
+
+    def test_follow_invalidates_profile(self):
+        check = self.revalidate(self.profile, self.reader_client)
+
+        Follow.objects.create(user=self.reader, author=self.author)
+
+        self.assertEqual(check(), HTTPStatus.OK)
+
+    def test_etag_depends_on_user(self):
+        self.assertNotEqual(
+            self.get(self.index)['ETag'],
+            self.get(self.index, self.reader_client)['ETag'],
+        )
@@ -0,0 +1,128 @@
+import gzip
+import json
+import os
+import tempfile
+import unittest
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+from ..search import SEARCH_TRIGGERS
+
+User = get_user_model()
+
+ROWS = 500_000
+# Допустимый прирост пикового RSS при выгрузке: пачка строк из базы
+# и буферы записи. Вся таблица в памяти заняла бы сотни мегабайт.
+MEMORY_BUDGET = 20 * 2 ** 20
+CLEAR_REFS = '/proc/self/clear_refs'
+
+
+def peak_rss():
+    """Пиковый RSS процесса в байтах (VmHWM)."""
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmHWM:'):
+                return int(line.split()[1]) * 2 ** 10
+
+
+def current_rss():
+    with open('/proc/self/status') as status:
+        for line in status:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1]) * 2 ** 10
+
+
+def reset_peak_rss():
+    with open(CLEAR_REFS, 'w') as clear_refs:
+        clear_refs.write('5')
+
+
+class ExportPostsTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+            description='Тестовое описание',
+        )
+        cls.post = Post.objects.create(
+            author=cls.user,
+            group=cls.group,
+            text='Первый, с "кавычками"\nи переносом',
+        )
+
+    def export(self, *args):
+        fd, path = tempfile.mkstemp(suffix=args[0])
+        os.close(fd)
+        self.addCleanup(os.remove, path)
+        call_command('export_posts', path, *args[1:], stderr=StringIO())
+        return path
+
+    def test_export_round_trips_through_import(self):
+        """Выгрузка в JSONL и CSV читается import_posts обратно."""
+        for suffix in ('.jsonl', '.csv.gz'):
+            with self.subTest(suffix=suffix):
+                path = self.export(suffix)
+                Post.objects.filter(author=self.user).delete()
+
+                call_command('import_posts', path, stdout=StringIO())
+
+                post = Post.objects.get(author=self.user)
+                self.assertEqual(post.text, self.post.text)
+                self.assertEqual(post.group, self.group)
+                self.assertEqual(post.pub_date, self.post.pub_date)
+
+    def test_admin_action_streams_gzip(self):
+        admin = User.objects.create_superuser(
+            username='admin', email='admin@example.com', password='pass'
+        )
+        self.client.force_login(admin)
+
+        response = self.client.post(
+            reverse('admin:posts_post_changelist'),
+            {'action': 'export_jsonl', '_selected_action': [self.post.pk]}
+        )
+
+        self.assertTrue(response.streaming)
+        lines = gzip.decompress(
+            b''.join(response.streaming_content)
+        ).decode().splitlines()
+        self.assertEqual(
+            [json.loads(line)['author'] for line in lines], ['auth']
+        )
+
+    @unittest.skipUnless(
+        os.access(CLEAR_REFS, os.W_OK), 'нужен Linux с /proc'
+    )
+    def test_memory_does_not_grow_with_table(self):
+        """Выгрузка 500 тысяч постов укладывается в постоянный
+        объём памяти."""
+        with connection.cursor() as cursor:
+            # Индекс поиска здесь не нужен, а заполнение замедляет.
+            for trigger in SEARCH_TRIGGERS:
+                cursor.execute(f'DROP TRIGGER {trigger}')
+            cursor.execute(
+                'WITH RECURSIVE n(i) AS '
+                '(SELECT 1 UNION ALL SELECT i + 1 FROM n WHERE i < %s) '
+                'INSERT INTO posts_post '
+                '(text, pub_date, edited, author_id, image) '
+                "SELECT 'Пост ' || i, datetime('now'), datetime('now'), "
+                "%s, '' FROM n",
+                [ROWS, self.user.pk]
+            )
+
+        reset_peak_rss()
+        baseline = current_rss()
+        path = self.export('.jsonl.gz')
+        growth = peak_rss() - baseline
+
+        with gzip.open(path, 'rt', encoding='utf-8') as stream:
+            self.assertEqual(sum(1 for _ in stream), ROWS + 1)
+        self.assertLess(growth, MEMORY_BUDGET)
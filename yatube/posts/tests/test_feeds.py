@@ -0,0 +1,108 @@
+from http import HTTPStatus
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Group, Post
+
+User = get_user_model()
+
+
+class SyndicationTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = User.objects.create_user(
+            username='author', first_name='Лев', last_name='Толстой'
+        )
+        cls.group = Group.objects.create(
+            title='Группа', slug='group', description='Описание'
+        )
+        cls.post = Post.objects.create(
+            author=cls.author, text='Пост для ленты', group=cls.group
+        )
+        cls.feeds = {
+            'index': ('posts:index_feed', ()),
+            'group': ('posts:group_feed', (cls.group.slug,)),
+            'author': ('posts:author_feed', (cls.author.username,)),
+        }
+
+    def setUp(self):
+        cache.clear()
+
+    def url(self, feed, feed_format):
+        name, args = self.feeds[feed]
+        return reverse(name, args=(*args, feed_format))
+
+    def test_formats(self):
+        content_types = {
+            'rss': 'application/rss+xml',
+            'atom': 'application/atom+xml',
+            'json': 'application/feed+json',
+        }
+        for feed in self.feeds:
+            for feed_format, content_type in content_types.items():
+                with self.subTest(feed=feed, feed_format=feed_format):
+                    response = self.client.get(self.url(feed, feed_format))
+                    self.assertEqual(response.status_code, HTTPStatus.OK)
+                    self.assertTrue(
+                        response['Content-Type'].startswith(content_type)
+                    )
+                    self.assertContains(response, 'Пост для ленты')
+                    self.assertContains(response, 'Лев Толстой')
+
+    def test_json_feed(self):
+        data = self.client.get(self.url('group', 'json')).json()
+
+        self.assertEqual(data['version'], 'https://jsonfeed.org/version/1.1')
+        self.assertEqual(data['title'], 'Yatube: Группа')
+        item, = data['items']
+        self.assertTrue(item['url'].endswith(
+            reverse('posts:post_detail', args=(self.post.pk,))
+        ))
+        self.assertIn('date_modified', item)
+
+    def test_poll_costs_one_query(self):
+        url = self.url('author', 'atom')
+        self.client.get(url)
+        etag = self.client.get(url)['ETag']
+
+        with self.assertNumQueries(1):
+            cached = self.client.get(url)
+        with self.assertNumQueries(1):
+            not_modified = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertContains(cached, 'Пост для ленты')
+        self.assertEqual(not_modified.status_code, HTTPStatus.NOT_MODIFIED)
+
+    def test_changes_invalidate_feed(self):
+        changes = {
+            'новый пост': lambda: Post.objects.create(
+                author=self.author, text='Свежий пост', group=self.group
+            ),
+            'правка группы': lambda: Group.objects.filter(
+                pk=self.group.pk
+            ).first().save(),
+        }
+        url = self.url('group', 'rss')
+        self.client.get(url)
+        for name, change in changes.items():
+            with self.subTest(change=name):
+                etag = self.client.get(url)['ETag']
+                change()
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertContains(response, 'Пост для ленты')
+        self.assertContains(response, 'Свежий пост')
+
+    def test_unknown_feed_is_404(self):
+        urls = (
+            reverse('posts:index_feed', args=('yaml',)),
+            reverse('posts:group_feed', args=('missing', 'rss')),
+            reverse('posts:author_feed', args=('missing', 'rss')),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url)
+                self.assertEqual(response.status_code, HTTPStatus.NOT_FOUND)
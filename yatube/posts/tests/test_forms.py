@@ -3,7 +3,7 @@ from django.test import Client, TestCase
 from django.contrib.auth import get_user_model
 
 from ..forms import PostForm
-from ..models import Post, Group
+from ..models import Comment, Counter, Post, Group
 
 User = get_user_model()
 
@@ -85,3 +85,25 @@ class PostFormTests(TestCase):
                 group=self.group,
             ).exists()
         )
+
+    def test_add_comment(self):
+        """Комментарий появляется на странице поста, счётчик растёт."""
+        url = reverse('posts:add_comment', args=(self.post.id,))
+        detail = reverse('posts:post_detail', args=(self.post.id,))
+
+        self.guest_client.post(url, data={'text': 'Аноним'})
+        response = self.authorized_client.post(
+            url,
+            data={'text': 'Тестовый комментарий'},
+            follow=True
+        )
+
+        self.assertRedirects(response, detail)
+        self.assertEqual(
+            [comment.text for comment in response.context['comments']],
+            ['Тестовый комментарий']
+        )
+        self.assertFalse(Comment.objects.filter(text='Аноним').exists())
+        self.assertEqual(
+            Counter.objects.value(Counter.COMMENTS, self.post.id), 1
+        )
@@ -1,7 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.test import TestCase
 
-from ..models import Group, Post
+from ..models import Counter, Group, Post
 
 User = get_user_model()
 
@@ -72,3 +72,51 @@ class GroupModelTest(TestCase):
         expected_object_name = group.title
 
         self.assertEqual(expected_object_name, str(group))
+
+
+class CounterTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+        )
+        cls.other_group = Group.objects.create(
+            title='Другая группа',
+            slug='other-slug',
+        )
+
+    def assertCountersExact(self):
+        counters = (
+            (Counter.TOTAL, 0),
+            (Counter.AUTHOR, self.user.pk),
+            (Counter.GROUP, self.group.pk),
+            (Counter.GROUP, self.other_group.pk),
+        )
+        for scope, object_id in counters:
+            with self.subTest(scope=scope, object_id=object_id):
+                self.assertEqual(
+                    Counter.objects.value(scope, object_id),
+                    Counter.source(scope, object_id).count()
+                )
+
+    def test_counters_follow_post_changes(self):
+        """Счётчики меняются при создании, переносе и удалении поста."""
+        self.assertCountersExact()
+        post = Post.objects.create(
+            author=self.user,
+            text='Тестовый пост',
+            group=self.group,
+        )
+        Post.objects.create(author=self.user, text='Без группы')
+        self.assertCountersExact()
+
+        post = Post.objects.get(pk=post.pk)
+        post.group = self.other_group
+        post.save()
+        self.assertCountersExact()
+
+        post.delete()
+        self.assertCountersExact()
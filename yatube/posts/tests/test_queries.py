@@ -0,0 +1,61 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from ..models import Comment, Follow, Group, Post
+
+User = get_user_model()
+
+
+@override_settings(QUERY_INSPECTION=True, QUERY_INSPECTION_RAISE=True)
+class NoNPlusOneTest(TestCase):
+    """Страницы приложения не делают запросов на каждую строку:
+    N+1 в любом шаблоне роняет этот тест с местом в шаблоне."""
+
+    @classmethod
+    def setUpTestData(cls):
+        cls.reader = User.objects.create_user(username='reader')
+        cls.group = Group.objects.create(title='Группа', slug='group')
+        authors = [
+            User.objects.create_user(
+                username=f'author{index}',
+                first_name='Имя',
+                last_name=f'Фамилия {index}',
+            )
+            for index in range(12)
+        ]
+        for author in authors:
+            Follow.objects.create(user=cls.reader, author=author)
+            cls.post = Post.objects.create(
+                author=author, text='Пост с котом', group=cls.group
+            )
+        for author in authors:
+            Comment.objects.create(
+                post=cls.post, author=author, text='Комментарий'
+            )
+
+    def setUp(self):
+        cache.clear()
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def test_pages(self):
+        urls = (
+            reverse('posts:index'),
+            reverse('posts:index') + '?page=2',
+            reverse('posts:group_posts', args=(self.group.slug,)),
+            reverse('posts:profile', args=(self.post.author.username,)),
+            reverse('posts:post_detail', args=(self.post.id,)),
+            reverse('posts:follow_index'),
+            reverse('posts:search') + '?q=кот',
+            reverse('posts:post_create'),
+            reverse('posts:index_feed', args=('rss',)),
+            reverse('posts:group_feed', args=(self.group.slug, 'atom')),
+            reverse(
+                'posts:author_feed', args=(self.post.author.username, 'json')
+            ),
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                self.assertEqual(self.client.get(url).status_code, 200)
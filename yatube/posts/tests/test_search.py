@@ -0,0 +1,57 @@
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.urls import reverse
+
+from ..models import Post
+from ..search import SearchResults, highlight
+
+User = get_user_model()
+
+
+class SearchTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Somebody')
+        cls.rare = Post.objects.create(
+            author=cls.user, text='Кошка гуляет по крыше'
+        )
+        cls.often = Post.objects.create(
+            author=cls.user, text='Кошка, кошка и ещё раз кошка'
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Собака номер {num}')
+            for num in range(3)
+        )
+        cls.url = reverse('posts:search')
+
+    def test_results_are_ranked(self):
+        """Пост, где слово встречается чаще, стоит выше."""
+        response = self.client.get(self.url, {'q': 'кошка'})
+        self.assertEqual(
+            list(response.context['page_obj']), [self.often, self.rare]
+        )
+        self.assertEqual(response.context['page_obj'].paginator.count, 2)
+
+    def test_bulk_created_posts_are_indexed(self):
+        self.assertEqual(SearchResults('собака').count(), 3)
+
+    def test_index_follows_edit_and_delete(self):
+        post = Post.objects.create(author=self.user, text='Старый текст')
+        post.text = 'Новый текст'
+        post.save()
+        self.assertEqual(SearchResults('старый').count(), 0)
+        self.assertEqual(SearchResults('новый').count(), 1)
+        post.delete()
+        self.assertEqual(SearchResults('новый').count(), 0)
+
+    def test_query_syntax_is_not_interpreted(self):
+        """Спецсимволы FTS5 в запросе не ломают поиск."""
+        for query in ('"', 'кошка OR', 'NEAR(', '*', ''):
+            with self.subTest(query=query):
+                response = self.client.get(self.url, {'q': query})
+                self.assertEqual(response.status_code, 200)
+
+    def test_snippet_is_escaped(self):
+        snippet = highlight('<b>\x02кошка\x03</b>')
+        self.assertEqual(snippet, '&lt;b&gt;<mark>кошка</mark>&lt;/b&gt;')
@@ -0,0 +1,135 @@
+import os
+import shutil
+import tempfile
+from io import BytesIO, StringIO
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+from sorl.thumbnail import get_thumbnail
+
+from .. import thumbnails
+from ..models import Post
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+
+def make_image(name='image.jpg', size=(1200, 800), image_format='JPEG'):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'lightskyblue').save(buffer, image_format)
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/jpeg')
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT)
+class PostImageTestCase(TestCase):
+    """Пост с картинкой во временном MEDIA_ROOT."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(
+            author=cls.user,
+            text='Пост с картинкой',
+            image=make_image(),
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        # key-value хранилище sorl кэширует записи, которые
+        # откатываются вместе с транзакцией теста.
+        cache.clear()
+
+
+class ThumbnailsTest(PostImageTestCase):
+
+    def test_precomputed_name_matches_sorl(self):
+        """Вычисленное имя миниатюры совпадает с тем, что создаёт sorl."""
+        geometry, options = thumbnails.geometry('detail')
+
+        thumbnail = get_thumbnail(self.post.image, geometry, **options)
+
+        self.assertEqual(
+            thumbnails.thumbnail_name(self.post.image, 'detail'),
+            thumbnail.name
+        )
+
+    def test_generate_creates_all_thumbnails(self):
+        """generate создаёт файлы всех настроенных миниатюр."""
+        thumbnails.generate(self.post.image.name)
+
+        for alias in settings.POST_THUMBNAILS:
+            with self.subTest(alias=alias):
+                name = thumbnails.thumbnail_name(self.post.image, alias)
+                self.assertTrue(
+                    os.path.exists(os.path.join(TEMP_MEDIA_ROOT, name))
+                )
+
+    def test_post_detail_renders_thumbnail_url_without_queries(self):
+        """Страница поста выводит URL миниатюры без обращения
+        к key-value хранилищу sorl."""
+        thumbnails.generate(self.post.image.name)
+        url = thumbnails.thumbnail_url(self.post.image, 'detail')
+        self.assertNotEqual(url, self.post.image.url)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse('posts:post_detail', args=(self.post.id,))
+            )
+
+        self.assertContains(response, url)
+        for query in queries.captured_queries:
+            self.assertNotIn('thumbnail_kvstore', query['sql'])
+
+    def test_missing_thumbnail_falls_back_to_original(self):
+        """Пока миниатюра не создана, страница поста показывает
+        исходную картинку, а не битую ссылку."""
+        post = Post.objects.create(
+            author=self.user, text='Новый пост', image=make_image('new.jpg')
+        )
+
+        response = self.client.get(
+            reverse('posts:post_detail', args=(post.id,))
+        )
+
+        self.assertContains(response, f'src="{post.image.url}"')
+
+
+class ThumbnailsCommandTest(PostImageTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.thumbnail_path = os.path.join(
+            TEMP_MEDIA_ROOT,
+            thumbnails.thumbnail_name(cls.post.image, 'detail')
+        )
+
+    def test_warm_creates_missing_and_prune_removes_orphans(self):
+        """warm создаёт недостающие миниатюры, prune удаляет
+        лишние файлы и оставляет нужные."""
+        orphan = os.path.join(TEMP_MEDIA_ROOT, 'cache', 'ab', 'cd', 'x.jpg')
+        os.makedirs(os.path.dirname(orphan))
+        with open(orphan, 'wb') as file:
+            file.write(b'0' * 100)
+        out = StringIO()
+
+        call_command('thumbnails', 'warm', processes=1, stdout=out)
+        call_command('thumbnails', 'prune', stdout=out)
+
+        self.assertTrue(os.path.exists(self.thumbnail_path))
+        self.assertFalse(os.path.exists(orphan))
+        self.assertIn('без миниатюр: 1', out.getvalue())
+        self.assertIn('освобождено: 100 байт', out.getvalue())
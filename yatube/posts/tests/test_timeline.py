@@ -0,0 +1,172 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.test import (
+    Client, TestCase, TransactionTestCase, override_settings
+)
+from django.urls import reverse
+
+from core import tasks
+from core.models import Task
+
+from ..models import Follow, Post, TimelineEntry
+
+User = get_user_model()
+
+
+@override_settings(TIMELINE_ASYNC=False)
+class FollowFeedTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.reader = User.objects.create_user(username='reader')
+        cls.author = User.objects.create_user(username='author')
+        cls.stranger = User.objects.create_user(username='stranger')
+        cls.feed = reverse('posts:follow_index')
+
+    def setUp(self):
+        self.client = Client()
+        self.client.force_login(self.reader)
+
+    def follow(self, author, client=None):
+        (client or self.client).get(
+            reverse('posts:profile_follow', args=(author.username,))
+        )
+
+    def feed_posts(self, client=None):
+        response = (client or self.client).get(self.feed)
+        return list(response.context['page_obj'])
+
+    def test_follow_and_unfollow(self):
+        """Подписка добавляет в ленту старые и новые посты автора,
+        отписка убирает их, посты чужих авторов в ленту не попадают."""
+        old = Post.objects.create(author=self.author, text='Старый')
+        self.follow(self.author)
+        self.follow(self.reader)
+        new = Post.objects.create(author=self.author, text='Новый')
+        Post.objects.create(author=self.stranger, text='Чужой')
+
+        self.assertEqual(self.feed_posts(), [new, old])
+        self.assertFalse(
+            Follow.objects.filter(user=self.reader, author=self.reader)
+            .exists()
+        )
+
+        self.client.get(
+            reverse('posts:profile_unfollow', args=(self.author.username,))
+        )
+        self.assertEqual(self.feed_posts(), [])
+
+    @override_settings(FOLLOW_FANOUT_LIMIT=1)
+    def test_popular_author_is_read_on_demand(self):
+        """Посты популярного автора не копируются в ленты,
+        но показываются вперемешку с остальными."""
+        other = Client()
+        other.force_login(self.stranger)
+        self.follow(self.author)
+        self.follow(self.author, other)
+        self.follow(self.stranger)
+        first = Post.objects.create(author=self.stranger, text='1')
+        second = Post.objects.create(author=self.author, text='2')
+        third = Post.objects.create(author=self.stranger, text='3')
+
+        self.assertFalse(
+            TimelineEntry.objects.filter(author=self.author).exists()
+        )
+        self.assertEqual(self.feed_posts(), [third, second, first])
+
+        other.get(
+            reverse('posts:profile_unfollow', args=(self.author.username,))
+        )
+        self.assertTrue(
+            TimelineEntry.objects.filter(
+                user=self.reader,
+                post=second
+            ).exists()
+        )
+        self.assertEqual(self.feed_posts(), [third, second, first])
+
+    @override_settings(FOLLOW_FANOUT_LIMIT=1)
+    def test_cursor_pages_and_query_budget(self):
+        """Лента листается курсором в обе стороны, и число запросов
+        растёт только с числом популярных авторов."""
+        other = Client()
+        other.force_login(self.stranger)
+        authors = [
+            User.objects.create_user(username=f'author{num}')
+            for num in range(3)
+        ]
+        for author in authors:
+            self.follow(author)
+        for author in authors[1:]:
+            self.follow(author, other)
+        for num in range(settings.POST_PER_PAGE * 2 + 3):
+            Post.objects.create(author=authors[num % 3], text=f'P{num}')
+        expected = list(
+            Post.objects.filter(author__in=authors)
+            .order_by('-pub_date', '-id')
+        )
+
+        # Пользователь, популярные авторы, лента, посты двух
+        # популярных авторов и посты страницы.
+        with self.assertNumQueries(6):
+            response = self.client.get(self.feed)
+        pages = [response.context['page_obj']]
+        while pages[-1].has_next():
+            response = self.client.get(
+                self.feed, {'after': pages[-1].next_cursor}
+            )
+            pages.append(response.context['page_obj'])
+        self.assertEqual(
+            [post for page in pages for post in page], expected
+        )
+
+        response = self.client.get(
+            self.feed, {'before': pages[-1].previous_cursor}
+        )
+        self.assertEqual(
+            list(response.context['page_obj']), list(pages[-2])
+        )
+
+
+@override_settings(TIMELINE_ASYNC=True, TASK_QUEUE_IN_PROCESS=False)
+class DeferredTimelineTest(TransactionTestCase):
+    """Раскладка идёт через очередь: задачи ставятся после
+    коммита, поэтому нужен TransactionTestCase."""
+
+    def setUp(self):
+        self.reader = User.objects.create_user(username='reader')
+        self.author = User.objects.create_user(username='author')
+        Follow.objects.create(user=self.reader, author=self.author)
+
+    def test_new_post_is_fanned_out_by_task(self):
+        post = Post.objects.create(author=self.author, text='Пост')
+
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(tasks.run_batch('worker', 10), (1, 0))
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.reader, post=post)
+            .exists()
+        )
+
+    def test_post_without_followers_is_not_queued(self):
+        Post.objects.create(author=self.reader, text='Пост')
+
+        self.assertFalse(Task.objects.exists())
+
+    @override_settings(FOLLOW_FANOUT_LIMIT=1)
+    def test_unfollow_of_popular_author_defers_backfill(self):
+        other = User.objects.create_user(username='other')
+        Follow.objects.create(user=other, author=self.author)
+        post = Post.objects.create(author=self.author, text='Пост')
+        # Посты популярного автора не раскладываются.
+        self.assertFalse(Task.objects.exists())
+
+        Follow.objects.filter(user=other).delete()
+
+        self.assertFalse(TimelineEntry.objects.exists())
+        self.assertEqual(Task.objects.count(), 1)
+        tasks.run_batch('worker', 10)
+        self.assertTrue(
+            TimelineEntry.objects.filter(user=self.reader, post=post)
+            .exists()
+        )
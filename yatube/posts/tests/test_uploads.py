@@ -0,0 +1,193 @@
+import gc
+import os
+import shutil
+import sys
+import tempfile
+import tracemalloc
+import warnings
+from contextlib import contextmanager
+from io import BytesIO
+
+from django.conf import global_settings, settings
+from django.contrib.auth import get_user_model
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.template.defaultfilters import filesizeformat
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+from PIL import Image
+
+from ..models import Post
+from ..uploads import ImageUploadHandler
+
+User = get_user_model()
+
+TEMP_MEDIA_ROOT = tempfile.mkdtemp(dir=settings.BASE_DIR)
+
+UPLOAD_SIZE = 50 * 2 ** 20
+CHUNK = b'\0' * ImageUploadHandler.chunk_size
+# Допустимый прирост памяти при приёме загрузки, не считая
+# уже выделенного куска данных.
+MEMORY_BUDGET = 2 * 2 ** 20
+
+
+def stream_upload(handler, size=UPLOAD_SIZE):
+    """Прогоняет через обработчик size байт так же, как это делает
+    MultiPartParser, и возвращает (файл, пик памяти)."""
+    handler.new_file('image', 'big.jpg', 'image/jpeg', size)
+    # Плагины PIL импортируются при первом Image.open, не считаем их.
+    Image.init()
+    tracemalloc.start()
+    try:
+        for start in range(0, size, len(CHUNK)):
+            handler.receive_data_chunk(CHUNK, start)
+        uploaded = handler.file_complete(size)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return uploaded, peak
+
+
+@contextmanager
+def no_leaked_files(test):
+    """Роняет тест, если внутри блока файл остался незакрытым:
+    ResourceWarning и ошибки финализаторов всплывают при сборке
+    мусора и иначе только печатаются."""
+    unraisable = []
+    hook = sys.unraisablehook
+    sys.unraisablehook = unraisable.append
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', ResourceWarning)
+            yield
+            gc.collect()
+    finally:
+        sys.unraisablehook = hook
+    test.assertEqual(
+        [repr(item.exc_value) for item in unraisable], []
+    )
+
+
+def make_image(size, name='image.jpg'):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'lightskyblue').save(buffer, 'JPEG')
+    return SimpleUploadedFile(name, buffer.getvalue(), 'image/jpeg')
+
+
+class ImageUploadHandlerTest(TestCase):
+    def test_oversized_upload_rejected_with_constant_memory(self):
+        """Загрузка 50 МБ сверх лимита отклоняется,
+        а память не растёт вместе с размером файла."""
+        uploaded, peak = stream_upload(ImageUploadHandler())
+
+        self.assertTrue(uploaded.upload_error)
+        self.assertEqual(uploaded.size, 0)
+        self.assertLess(peak, MEMORY_BUDGET)
+
+    @override_settings(POST_IMAGE_MAX_UPLOAD_SIZE=UPLOAD_SIZE)
+    def test_allowed_upload_streams_to_disk(self):
+        """Допустимые 50 МБ пишутся во временный файл,
+        а не копятся в памяти."""
+        uploaded, peak = stream_upload(ImageUploadHandler())
+
+        try:
+            self.assertEqual(
+                os.path.getsize(uploaded.temporary_file_path()),
+                UPLOAD_SIZE
+            )
+        finally:
+            uploaded.close()
+        self.assertLess(peak, MEMORY_BUDGET)
+
+    @override_settings(POST_IMAGE_MAX_PIXELS=100 * 100)
+    def test_too_many_pixels_rejected_by_header(self):
+        """Картинка с лишними пикселями отклоняется по заголовку."""
+        handler = ImageUploadHandler()
+        image = make_image((200, 200)).read()
+        handler.new_file('image', 'image.jpg', 'image/jpeg', len(image))
+
+        handler.receive_data_chunk(image, 0)
+        uploaded = handler.file_complete(len(image))
+
+        self.assertIn('200×200', uploaded.upload_error)
+
+
+@override_settings(MEDIA_ROOT=TEMP_MEDIA_ROOT, POST_THUMBNAILS_ASYNC=False)
+class PostImageUploadTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='auth')
+        cls.post = Post.objects.create(author=cls.user, text='Тест')
+        cls.post_edit = reverse('posts:post_edit', args=(cls.post.id,))
+
+    @classmethod
+    def tearDownClass(cls):
+        super().tearDownClass()
+        shutil.rmtree(TEMP_MEDIA_ROOT, ignore_errors=True)
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    @override_settings(POST_IMAGE_MAX_DIMENSION=100)
+    def test_edit_downscales_large_image(self):
+        """Слишком большая картинка уменьшается перед сохранением,
+        временные файлы загрузки закрываются."""
+        with no_leaked_files(self):
+            self.authorized_client.post(
+                self.post_edit,
+                {'text': 'Тест', 'image': make_image((300, 150))},
+            )
+
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.image.width, 100)
+        self.assertEqual(self.post.image.height, 50)
+
+    @override_settings(POST_IMAGE_MAX_UPLOAD_SIZE=100)
+    def test_edit_reports_rejected_upload(self):
+        """Отклонённая загрузка показывается как ошибка формы."""
+        response = self.authorized_client.post(
+            self.post_edit,
+            {'text': 'Тест', 'image': make_image((300, 150))},
+        )
+
+        self.assertFormError(
+            response,
+            'image_form',
+            'image',
+            f'Файл больше {filesizeformat(100)}'
+        )
+
+    @override_settings(POST_IMAGE_MAX_UPLOAD_SIZE=100)
+    def test_create_reports_rejected_upload(self):
+        """Ограничение действует и при создании поста."""
+        response = self.authorized_client.post(
+            reverse('posts:post_create'),
+            {'text': 'Тест', 'image': make_image((300, 150))},
+        )
+
+        self.assertFormError(
+            response,
+            'image_form',
+            'image',
+            f'Файл больше {filesizeformat(100)}'
+        )
+
+    def test_csrf_is_checked_with_image_handler(self):
+        """Обработчик ставится до проверки CSRF, но она остаётся."""
+        client = Client(enforce_csrf_checks=True)
+        client.force_login(self.user)
+
+        response = client.post(self.post_edit, {'text': 'Без токена'})
+
+        self.assertTemplateUsed(response, 'core/403csrf.html')
+        self.post.refresh_from_db()
+        self.assertNotEqual(self.post.text, 'Без токена')
+
+    def test_other_uploads_use_default_handlers(self):
+        """Остальные загрузки проекта, например в админке,
+        обрабатываются как обычно."""
+        self.assertEqual(
+            settings.FILE_UPLOAD_HANDLERS,
+            global_settings.FILE_UPLOAD_HANDLERS
+        )
@@ -0,0 +1,100 @@
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import Post
+from ..utils import CursorPaginator, encode_cursor
+
+User = get_user_model()
+
+
+class CursorPaginatorTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Somebody')
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Test{num}')
+            for num in range(settings.POST_PER_PAGE * 3 + 2)
+        )
+        cls.index = reverse('posts:index')
+
+    def test_cursor_pages_follow_numbered_pages(self):
+        """Переход по курсорам «вперёд» и «назад» даёт те же посты,
+        что и номерные страницы."""
+        posts = Post.objects.for_feed()
+        paginator = CursorPaginator(posts, settings.POST_PER_PAGE)
+        numbered = [
+            list(paginator.page(number))
+            for number in paginator.page_range
+        ]
+
+        page = paginator.page(1)
+        forward = [list(page)]
+        while page.has_next():
+            page = paginator.page_after(page.next_cursor)
+            forward.append(list(page))
+        backward = [list(page)]
+        while page.has_previous():
+            page = paginator.page_before(page.previous_cursor)
+            backward.append(list(page))
+
+        self.assertEqual(forward, numbered)
+        self.assertEqual(backward[::-1], numbered)
+
+    def test_cursor_page_without_count_and_offset(self):
+        """Страница по курсору не выполняет COUNT и OFFSET."""
+        post = Post.objects.for_feed()[settings.POST_PER_PAGE]
+        cursor = encode_cursor(post.pub_date, post.id)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(self.index, {'after': cursor})
+
+        page_obj = response.context['page_obj']
+        self.assertEqual(len(page_obj), settings.POST_PER_PAGE)
+        self.assertTrue(page_obj.has_next())
+        for query in queries.captured_queries:
+            with self.subTest(sql=query['sql']):
+                self.assertNotIn('COUNT(', query['sql'].upper())
+                self.assertNotIn('OFFSET', query['sql'].upper())
+
+    def test_broken_cursor_falls_back_to_first_page(self):
+        """Испорченный курсор ведёт на первую страницу."""
+        post = Post.objects.first()
+        cursors = (
+            'broken',
+            # id за пределами 64-битного целого SQLite не примет.
+            encode_cursor(post.pub_date, 10 ** 20),
+            'A' * 1000,
+        )
+        urls = (
+            self.index,
+            reverse('posts:profile', args=(self.user.username,)),
+        )
+        for url in urls:
+            for cursor in cursors:
+                with self.subTest(url=url, cursor=cursor[:20]):
+                    response = self.client.get(url, {'after': cursor})
+
+                    self.assertEqual(
+                        response.context['page_obj'].number, 1
+                    )
+
+    def test_empty_cursor_page_falls_back_to_first_page(self):
+        """Курсор за краем ленты в обе стороны ведёт на первую
+        страницу, а не на пустую без ссылок."""
+        posts = Post.objects.for_feed()
+        oldest, newest = posts.last(), posts.first()
+        params = (
+            {'after': encode_cursor(oldest.pub_date, oldest.id)},
+            {'before': encode_cursor(newest.pub_date, newest.id)},
+        )
+        for query in params:
+            with self.subTest(query=query):
+                response = self.client.get(self.index, query)
+
+                self.assertEqual(response.status_code, 200)
+                self.assertEqual(response.context['page_obj'].number, 1)
@@ -1,13 +1,16 @@
 from http import HTTPStatus
+from io import StringIO
 
 from django import forms
 from django.urls import reverse
 from django.core.paginator import Page
+from django.core.cache import cache
+from django.core.management import call_command
 from django.test import Client, TestCase
 from django.contrib.auth import get_user_model
 from django.conf import settings
 
-from ..models import Group, Post
+from ..models import Comment, Group, Post
 
 User = get_user_model()
 
@@ -247,3 +250,112 @@ class TestingPaginator(TestCase):
                     Page,
                     f'На станице {page} нет класса Page в контексте'
                 )
+
+
+class FeedQueriesTest(TestCase):
+    """Число запросов на страницу ленты не зависит от числа постов.
+    Первый запрос каждой страницы — валидатор для условного GET."""
+    FEED_QUERIES = {
+        'index': 3,
+        'group_posts': 4,
+        'profile': 4,
+    }
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.group = Group.objects.create(
+            title='Тестовая группа',
+            slug='test-slug',
+        )
+        cls.user = User.objects.create_user(username='Somebody')
+        authors = [
+            User.objects.create_user(username=f'author{num}')
+            for num in range(5)
+        ]
+        Post.objects.bulk_create(
+            Post(
+                author=authors[num % len(authors)],
+                text=f'Test{num}',
+                group=cls.group,
+            )
+            for num in range(30)
+        )
+        Post.objects.bulk_create(
+            Post(author=cls.user, text=f'Own{num}', group=cls.group)
+            for num in range(30)
+        )
+        call_command('rebuild_counters', stdout=StringIO())
+        cls.pages = {
+            'index': reverse('posts:index'),
+            'group_posts': reverse(
+                'posts:group_posts',
+                kwargs={'slug': cls.group.slug}
+            ),
+            'profile': reverse(
+                'posts:profile',
+                kwargs={'username': cls.user.username}
+            ),
+        }
+
+    def setUp(self):
+        cache.clear()
+
+    def test_feed_query_budget(self):
+        """Лента укладывается в фиксированное число запросов
+        при любом POST_PER_PAGE."""
+        for per_page in (1, 5, settings.POST_PER_PAGE, 25):
+            for name, page in self.pages.items():
+                with self.subTest(page=page, per_page=per_page):
+                    with self.settings(POST_PER_PAGE=per_page):
+                        with self.assertNumQueries(self.FEED_QUERIES[name]):
+                            response = self.client.get(page)
+                    self.assertEqual(
+                        len(response.context['page_obj']),
+                        per_page
+                    )
+
+
+class CommentQueriesTest(TestCase):
+    """Страница поста не зависит от числа комментариев."""
+    DETAIL_QUERIES = 5
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='Somebody')
+        cls.post = Post.objects.create(author=cls.user, text='Тест')
+        Comment.objects.bulk_create(
+            (
+                Comment(author=cls.user, post=cls.post, text=f'C{num}')
+                for num in range(10_000)
+            ),
+            batch_size=500
+        )
+        call_command('rebuild_counters', stdout=StringIO())
+        cls.url = reverse('posts:post_detail', args=(cls.post.id,))
+
+    def test_comment_pages_query_budget(self):
+        """Первая страница и страницы по курсору в глубине
+        укладываются в одинаковое число запросов."""
+        with self.assertNumQueries(self.DETAIL_QUERIES):
+            response = self.client.get(self.url)
+        comments = response.context['comments']
+        self.assertEqual(comments.paginator.count, 10_000)
+        self.assertEqual(len(comments), settings.COMMENTS_PER_PAGE)
+
+        seen = [comment.id for comment in comments]
+        for _ in range(3):
+            with self.assertNumQueries(self.DETAIL_QUERIES):
+                response = self.client.get(
+                    self.url, {'after': comments.next_cursor}
+                )
+            comments = response.context['comments']
+            seen.extend(comment.id for comment in comments)
+        self.assertEqual(
+            seen,
+            list(
+                Comment.objects.for_post(self.post.id)
+                .values_list('id', flat=True)[:len(seen)]
+            )
+        )
@@ -0,0 +1,79 @@
+"""Миниатюры картинок постов, которые создаются заранее.
+
+Имя файла миниатюры sorl-thumbnail вычисляет из имени исходника
+и параметров, поэтому шаблону достаточно посчитать его и взять URL
+из хранилища, не обращаясь ни к картинке, ни к key-value хранилищу.
+Сами файлы создаются после сохранения поста фоновой задачей.
+Пока задача не выполнена, вместо миниатюры отдаётся исходная
+картинка; для старых картинок миниатюры создаёт команда
+thumbnails warm.
+"""
+from django.conf import settings
+from django.db import transaction
+from sorl.thumbnail import default
+from sorl.thumbnail.base import ThumbnailBackend
+from sorl.thumbnail.conf import defaults as default_settings
+from sorl.thumbnail.conf import settings as thumbnail_settings
+from sorl.thumbnail.images import ImageFile
+
+from core import tasks
+
+
+class PostThumbnailBackend(ThumbnailBackend):
+    def resolve_options(self, source, options):
+        """Дополняет параметры так же, как ThumbnailBackend.get_thumbnail."""
+        options = dict(options)
+        if thumbnail_settings.THUMBNAIL_PRESERVE_FORMAT:
+            options.setdefault('format', self._get_format(source))
+        for key, value in self.default_options.items():
+            options.setdefault(key, value)
+        for key, attr in self.extra_options:
+            value = getattr(thumbnail_settings, attr)
+            if value != getattr(default_settings, attr):
+                options.setdefault(key, value)
+        return options
+
+    def thumbnail_name(self, file_, geometry_string, **options):
+        source = ImageFile(file_)
+        options = self.resolve_options(source, options)
+        return self._get_thumbnail_filename(source, geometry_string, options)
+
+
+backend = PostThumbnailBackend()
+
+
+def geometry(alias):
+    """Геометрия и параметры миниатюры из settings.POST_THUMBNAILS."""
+    options = dict(settings.POST_THUMBNAILS[alias])
+    return options.pop('geometry'), options
+
+
+def thumbnail_name(image, alias):
+    geometry_string, options = geometry(alias)
+    return backend.thumbnail_name(image, geometry_string, **options)
+
+
+def thumbnail_url(image, alias):
+    """URL миниатюры, а пока её нет — исходной картинки.
+    Проверка стоит одного обращения к хранилищу файлов."""
+    name = thumbnail_name(image, alias)
+    if default.storage.exists(name):
+        return default.storage.url(name)
+    return image.url
+
+
+@tasks.task
+def generate(image_name):
+    """Создаёт все миниатюры картинки, которых ещё нет."""
+    for alias in settings.POST_THUMBNAILS:
+        geometry_string, options = geometry(alias)
+        backend.get_thumbnail(image_name, geometry_string, **options)
+
+
+def schedule(image_name):
+    """Ставит создание миниатюр в очередь задач или, если
+    POST_THUMBNAILS_ASYNC выключен, создаёт их после коммита."""
+    if settings.POST_THUMBNAILS_ASYNC:
+        tasks.defer(generate, image_name)
+    else:
+        transaction.on_commit(lambda: generate(image_name))
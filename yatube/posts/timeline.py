@@ -0,0 +1,210 @@
+"""Лента подписок: раскладка постов при записи (fan-out)
+с чтением напрямую (fan-in) для популярных авторов.
+
+Пост автора, у которого не больше FOLLOW_FANOUT_LIMIT подписчиков,
+сразу копируется в TimelineEntry каждого подписчика. Посты популярных
+авторов в ленты не пишутся: их выбирают при чтении и сливают
+с TimelineEntry по ключу (дата, id).
+
+Раскладка нового поста и возврат постов автора, который перестал
+быть популярным, пишут до FOLLOW_FANOUT_LIMIT строк на пост,
+поэтому с TIMELINE_ASYNC они выполняются фоновыми задачами
+и появляются в лентах с небольшой задержкой.
+"""
+import heapq
+from itertools import islice
+
+from django.conf import settings
+from django.core.paginator import InvalidPage
+from django.utils.functional import cached_property
+
+from core import tasks
+
+from .models import Counter, Follow, Post, TimelineEntry
+from .utils import CursorPaginator, keyset_condition
+
+BATCH_SIZE = 500
+
+
+def is_popular(author_id):
+    followers = Counter.objects.value(Counter.FOLLOWERS, author_id)
+    return followers > settings.FOLLOW_FANOUT_LIMIT
+
+
+def needs_fan_out(author_id):
+    """Есть ли кому раскладывать посты автора: у большинства
+    авторов подписчиков нет, и задача им не нужна."""
+    followers = Counter.objects.value(Counter.FOLLOWERS, author_id)
+    return 0 < followers <= settings.FOLLOW_FANOUT_LIMIT
+
+
+def popular_authors(user_id):
+    """id популярных авторов, на которых подписан пользователь."""
+    popular = Counter.objects.filter(
+        scope=Counter.FOLLOWERS,
+        value__gt=settings.FOLLOW_FANOUT_LIMIT
+    ).values('object_id')
+    return list(
+        Follow.objects.filter(
+            user_id=user_id,
+            author_id__in=popular
+        ).values_list('author_id', flat=True)
+    )
+
+
+def _insert(entries):
+    entries = iter(entries)
+    batch = list(islice(entries, BATCH_SIZE))
+    while batch:
+        TimelineEntry.objects.bulk_create(batch, ignore_conflicts=True)
+        batch = list(islice(entries, BATCH_SIZE))
+
+
+def fan_out(post):
+    """Добавляет новый пост в ленты подписчиков автора."""
+    if is_popular(post.author_id):
+        return
+    followers = Follow.objects.filter(
+        author_id=post.author_id
+    ).values_list('user_id', flat=True)
+    _insert(
+        TimelineEntry(
+            user_id=user_id,
+            post_id=post.pk,
+            author_id=post.author_id,
+            pub_date=post.pub_date,
+        )
+        for user_id in followers.iterator()
+    )
+
+
+def backfill(author_id, user_ids):
+    """Добавляет все посты автора в ленты пользователей."""
+    user_ids = list(user_ids)
+    posts = Post.objects.filter(
+        author_id=author_id
+    ).values_list('id', 'pub_date')
+    _insert(
+        TimelineEntry(
+            user_id=user_id,
+            post_id=post_id,
+            author_id=author_id,
+            pub_date=pub_date,
+        )
+        for post_id, pub_date in posts.iterator()
+        for user_id in user_ids
+    )
+
+
+@tasks.task
+def fan_out_post(post_id):
+    post = Post.objects.filter(pk=post_id).only(
+        'author_id', 'pub_date'
+    ).first()
+    # Пост могли удалить раньше, чем дошла очередь.
+    if post is not None:
+        fan_out(post)
+
+
+@tasks.task
+def backfill_followers(author_id):
+    """Возвращает посты автора в ленты всех его подписчиков,
+    если он к этому времени всё ещё не популярен."""
+    if is_popular(author_id):
+        return
+    backfill(
+        author_id,
+        Follow.objects.filter(
+            author_id=author_id
+        ).values_list('user_id', flat=True)
+    )
+
+
+def schedule(func, *args):
+    """Ставит раскладку в очередь задач или, если TIMELINE_ASYNC
+    выключен, выполняет её сразу."""
+    if settings.TIMELINE_ASYNC:
+        tasks.defer(func, *args)
+    else:
+        func(*args)
+
+
+def remove(author_id, user_id):
+    TimelineEntry.objects.filter(
+        author_id=author_id,
+        user_id=user_id
+    ).delete()
+
+
+class TimelinePaginator(CursorPaginator):
+    """Лента подписок пользователя. Страницы только по курсору:
+    у слияния нескольких источников нет дешёвого смещения."""
+
+    def __init__(self, user_id, per_page):
+        super().__init__(Post.objects.for_feed(), per_page)
+        self.user_id = user_id
+
+    @cached_property
+    def popular(self):
+        return popular_authors(self.user_id)
+
+    def first_page(self):
+        rows = self._rows(None, False, self.per_page + 1)
+        return self._get_page(
+            rows[:self.per_page], None, self,
+            has_next=len(rows) > self.per_page, has_previous=False,
+            cursor=''
+        )
+
+    def _rows(self, bound, backwards, limit):
+        entries = TimelineEntry.objects.filter(user_id=self.user_id)
+        if self.popular:
+            # Старые записи автора, ставшего популярным, берутся
+            # вместе с остальными его постами из posts_post.
+            entries = entries.exclude(author_id__in=self.popular)
+        streams = [
+            self._keys(
+                entries, ('pub_date', 'post_id'), bound, backwards, limit
+            )
+        ]
+        streams.extend(
+            self._keys(
+                Post.objects.filter(author_id=author_id),
+                ('pub_date', 'id'),
+                bound,
+                backwards,
+                limit
+            )
+            for author_id in self.popular
+        )
+        keys = list(islice(
+            heapq.merge(*streams, reverse=not backwards), limit
+        ))
+        posts = self.object_list.in_bulk([pk for _, pk in keys])
+        return [posts[pk] for _, pk in keys if pk in posts]
+
+    @staticmethod
+    def _keys(queryset, key, bound, backwards, limit):
+        if bound is not None:
+            queryset = queryset.filter(
+                keyset_condition(key, *bound, backwards)
+            )
+        ordering = key
+        if not backwards:
+            ordering = tuple(f'-{name}' for name in key)
+        return queryset.order_by(*ordering).values_list(*key)[:limit]
+
+
+def timeline_page(user_id, request):
+    """Страница ленты подписок по ?after=, ?before= или первая."""
+    paginator = TimelinePaginator(user_id, settings.POST_PER_PAGE)
+    after = request.GET.get('after')
+    before = request.GET.get('before')
+    try:
+        if after:
+            return paginator.page_after(after)
+        if before:
+            return paginator.page_before(before)
+    except InvalidPage:
+        pass
+    return paginator.first_page()
@@ -0,0 +1,121 @@
+import os
+from functools import wraps
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.uploadedfile import (
+    InMemoryUploadedFile, UploadedFile
+)
+from django.core.files.uploadhandler import TemporaryFileUploadHandler
+from django.template.defaultfilters import filesizeformat
+from django.views.decorators.csrf import csrf_exempt, csrf_protect
+from PIL import Image
+
+# Сколько байт начала файла читать в поисках заголовка картинки.
+HEADER_LIMIT = 256 * 2 ** 10
+
+
+class RejectedUploadedFile(UploadedFile):
+    """Пустая заглушка вместо отклонённой загрузки, хранит причину."""
+
+    def __init__(self, name, upload_error):
+        super().__init__(BytesIO(), name, size=0)
+        self.upload_error = upload_error
+
+
+class ImageUploadHandler(TemporaryFileUploadHandler):
+    """Пишет загрузку во временный файл кусками и перестаёт писать,
+    как только файл превысил POST_IMAGE_MAX_UPLOAD_SIZE или заголовок
+    картинки показал больше POST_IMAGE_MAX_PIXELS пикселей."""
+
+    def new_file(self, *args, **kwargs):
+        super().new_file(*args, **kwargs)
+        self.size = 0
+        self.header = b''
+        self.upload_error = None
+
+    def receive_data_chunk(self, raw_data, start):
+        if self.upload_error:
+            return None
+        self.size += len(raw_data)
+        if self.size > settings.POST_IMAGE_MAX_UPLOAD_SIZE:
+            limit = filesizeformat(settings.POST_IMAGE_MAX_UPLOAD_SIZE)
+            self.upload_error = f'Файл больше {limit}'
+            return None
+        if self.header is not None:
+            self.check_header(raw_data)
+            if self.upload_error:
+                return None
+        return super().receive_data_chunk(raw_data, start)
+
+    def check_header(self, raw_data):
+        """Достаёт размеры картинки из заголовка, не декодируя её."""
+        self.header += raw_data
+        try:
+            with Image.open(BytesIO(self.header)) as image:
+                width, height = image.size
+        except Image.DecompressionBombError:
+            self.upload_error = 'Слишком большая картинка'
+            return
+        except (OSError, SyntaxError, ValueError):
+            if len(self.header) >= HEADER_LIMIT:
+                # Заголовок не нашёлся, дальше файл проверит форма.
+                self.header = None
+            return
+        self.header = None
+        if width * height > settings.POST_IMAGE_MAX_PIXELS:
+            self.upload_error = (
+                f'Слишком большая картинка: {width}×{height}'
+            )
+
+    def file_complete(self, file_size):
+        if self.upload_error:
+            self.file.close()
+            return RejectedUploadedFile(self.file_name, self.upload_error)
+        return super().file_complete(file_size)
+
+
+def image_uploads(view):
+    """Принимает загрузки представления через ImageUploadHandler,
+    остальные загрузки проекта идут обработчиками по умолчанию.
+
+    Обработчик нужно поставить до разбора тела запроса, а его
+    читает CsrfViewMiddleware. Поэтому проверка CSRF переносится
+    внутрь, как советует документация Django."""
+    protected = csrf_protect(view)
+
+    @csrf_exempt
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        request.upload_handlers.insert(0, ImageUploadHandler(request))
+        return protected(request, *args, **kwargs)
+    return wrapper
+
+
+def downscale(uploaded_file, max_dimension):
+    """Уменьшает картинку так, чтобы большая сторона была не больше
+    max_dimension. Возвращает новый файл или исходный, если он
+    и так достаточно мал.
+
+    Уменьшенная картинка невелика и собирается в памяти, а исходный
+    временный файл закрывается сразу, не дожидаясь конца запроса."""
+    with Image.open(uploaded_file) as image:
+        if max(image.size) <= max_dimension:
+            uploaded_file.seek(0)
+            return uploaded_file
+        image_format = image.format
+        # Для JPEG draft декодирует сразу в уменьшенном масштабе.
+        image.draft(image.mode, (max_dimension, max_dimension))
+        image.thumbnail((max_dimension, max_dimension))
+        content = BytesIO()
+        image.save(content, image_format)
+    uploaded_file.close()
+    content.seek(0)
+    return InMemoryUploadedFile(
+        content,
+        None,
+        os.path.basename(uploaded_file.name),
+        uploaded_file.content_type,
+        content.getbuffer().nbytes,
+        None,
+    )
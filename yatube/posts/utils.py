@@ -1,8 +1,189 @@
-from django.core.paginator import Paginator
+import base64
+import binascii
+from functools import partial
+
+from django.core.paginator import EmptyPage, InvalidPage, Page, Paginator
 from django.conf import settings
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+from .models import Counter
+
+
+# Курсор длиннее этого не выдаётся: дата ISO и id в пределах
+# знакового 64-битного целого, которым id хранится в базе.
+CURSOR_MAX_LENGTH = 100
+PK_MAX = 2 ** 63 - 1
+
+
+def encode_cursor(value, pk):
+    """Упаковывает ключ (дата, id) в непрозрачную строку для URL."""
+    raw = f'{value.isoformat()}|{pk}'.encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(cursor):
+    """Распаковывает курсор; на испорченный курсор — InvalidPage."""
+    if len(cursor) > CURSOR_MAX_LENGTH:
+        raise InvalidPage('Некорректный курсор')
+    try:
+        raw = base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4))
+        value, pk = raw.decode().split('|')
+        value = parse_datetime(value)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise InvalidPage('Некорректный курсор')
+    if value is None or not -PK_MAX - 1 <= pk <= PK_MAX:
+        raise InvalidPage('Некорректный курсор')
+    return value, pk
+
+
+def keyset_condition(key, value, pk, backwards=False):
+    """Условие «строго после (value, pk)» в порядке убывания ключа,
+    а при backwards — «строго до». Нестрогое условие по первому полю
+    даёт поиск по диапазону индекса, уточнение по второму отсекает
+    лишь строки с тем же значением."""
+    field, pk_field = key
+    lookup = 'gt' if backwards else 'lt'
+    return Q(**{f'{field}__{lookup}e': value}) & (
+        Q(**{f'{field}__{lookup}': value})
+        | Q(**{f'{pk_field}__{lookup}': pk})
+    )
+
+
+class CursorPage(Page):
+    """Страница, которая знает курсоры соседних страниц.
+
+    Страницы, полученные по курсору, не имеют номера:
+    для них не считается ни общее число объектов, ни смещение.
+    """
+
+    def __init__(self, object_list, number, paginator,
+                 has_next=None, has_previous=None, cursor=None):
+        super().__init__(object_list, number, paginator)
+        self._has_next = has_next
+        self._has_previous = has_previous
+        self.cursor = cursor
+
+    @property
+    def is_cursor(self):
+        return self.number is None
+
+    @property
+    def token(self):
+        """Строка, однозначно задающая страницу: номер или курсор."""
+        return self.cursor if self.is_cursor else str(self.number)
+
+    def has_next(self):
+        if self.is_cursor:
+            return self._has_next
+        return super().has_next()
+
+    def has_previous(self):
+        if self.is_cursor:
+            return self._has_previous
+        return super().has_previous()
+
+    @cached_property
+    def next_cursor(self):
+        if self.has_next() and len(self):
+            return self.paginator.cursor_for(self[-1])
+
+    @cached_property
+    def previous_cursor(self):
+        if self.has_previous() and len(self):
+            return self.paginator.cursor_for(self[0])
+
+
+class CursorPaginator(Paginator):
+    """Паджинатор по ключу (дата, id).
+
+    Номерные страницы работают как у обычного Paginator,
+    а страницы до и после курсора выбираются условием по ключу
+    с LIMIT, поэтому их стоимость не зависит от глубины.
+    Если передан count, общее число объектов берётся из него,
+    а не из COUNT(*).
+    """
+
+    def __init__(self, object_list, per_page, key=('pub_date', 'id'),
+                 count=None, **kwargs):
+        super().__init__(object_list, per_page, **kwargs)
+        self.key = key
+        self._count = count
+
+    @cached_property
+    def count(self):
+        if self._count is not None:
+            return self._count()
+        return super().count
+
+    def _get_page(self, *args, **kwargs):
+        return CursorPage(*args, **kwargs)
+
+    def cursor_for(self, obj):
+        return encode_cursor(*(getattr(obj, field) for field in self.key))
+
+    def page_after(self, cursor):
+        return self._cursor_page(cursor, backwards=False)
+
+    def page_before(self, cursor):
+        return self._cursor_page(cursor, backwards=True)
+
+    def _rows(self, bound, backwards, limit):
+        """Первые limit объектов после ключа bound = (value, pk),
+        а при backwards — ближайшие к нему объекты до него."""
+        condition = keyset_condition(self.key, *bound, backwards)
+        ordering = self.key
+        if not backwards:
+            ordering = tuple(f'-{name}' for name in ordering)
+        return list(
+            self.object_list.filter(condition).order_by(*ordering)[:limit]
+        )
+
+    def _cursor_page(self, cursor, backwards):
+        rows = self._rows(
+            decode_cursor(cursor), backwards, self.per_page + 1
+        )
+        if not rows:
+            # Курсор за краем ленты или посты удалены: у пустой
+            # страницы нет курсоров, чтобы сослаться на соседние.
+            raise EmptyPage('Страница по курсору пуста')
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if backwards:
+            rows.reverse()
+            return self._get_page(
+                rows, None, self, has_next=True, has_previous=has_more,
+                cursor=f'before:{cursor}'
+            )
+        return self._get_page(
+            rows, None, self, has_next=has_more, has_previous=True,
+            cursor=f'after:{cursor}'
+        )
 
 
-def paginate_objects(posts, request):
+def paginate_objects(posts, request, counter=None, per_page=None,
+                     key=('pub_date', 'id')):
+    """Страница ленты по ?after=, ?before= или ?page=.
+    counter — пара (scope, object_id) счётчика Counter с числом объектов."""
+    count = None
+    if counter is not None:
+        count = partial(Counter.objects.value, *counter)
+    paginator = CursorPaginator(
+        posts,
+        per_page or settings.POST_PER_PAGE,
+        key=key,
+        count=count
+    )
+    after = request.GET.get('after')
+    before = request.GET.get('before')
+    try:
+        if after:
+            return paginator.page_after(after)
+        if before:
+            return paginator.page_before(before)
+    except InvalidPage:
+        pass
     page_number = request.GET.get('page')
-    paginator = Paginator(posts, settings.POST_PER_PAGE)
     return paginator.get_page(page_number)
@@ -1,76 +1,180 @@
+from django.conf import settings
+from django.core.paginator import Paginator
 from django.shortcuts import render, get_object_or_404, redirect
 from django.contrib.auth.decorators import login_required
+from django.utils.http import urlencode
 
-from .forms import PostForm
-from .models import Post, Group, User
+from . import cache as feed_cache
+from . import timeline
+from .conditional import (
+    conditional_page, group_state, index_state, post_state, profile_state
+)
+from .forms import CommentForm, PostForm, PostImageForm
+from .models import Comment, Counter, Follow, Post, Group, User
+from .search import SearchResults
+from .uploads import image_uploads
 from .utils import paginate_objects
 
 
+@conditional_page(index_state)
 def index(request):
-    posts = Post.objects.all()
-    page_obj = paginate_objects(posts, request)
+    posts = Post.objects.for_feed()
+    page_obj = paginate_objects(posts, request, (Counter.TOTAL, 0))
     context = {
         'page_obj': page_obj,
+        'feed_cache_key': feed_cache.fragment_key(
+            feed_cache.INDEX, 0, page_obj
+        ),
     }
     return render(request, 'posts/index.html', context)
 
 
+@conditional_page(group_state)
 def group_posts(request, slug):
     group = get_object_or_404(Group, slug=slug)
-    posts = group.posts.all()
-    page_obj = paginate_objects(posts, request)
+    posts = Post.objects.for_feed().filter(group=group)
+    page_obj = paginate_objects(posts, request, (Counter.GROUP, group.pk))
     context = {
         'group': group,
         'page_obj': page_obj,
+        'feed_cache_key': feed_cache.fragment_key(
+            feed_cache.GROUP, group.pk, page_obj
+        ),
     }
     return render(request, 'posts/group_list.html', context)
 
 
+@conditional_page(profile_state)
 def profile(request, username):
     author = get_object_or_404(User, username=username)
-    post_list = author.posts.all()
-    page_obj = paginate_objects(post_list, request)
+    post_list = Post.objects.for_feed().filter(author=author)
+    page_obj = paginate_objects(
+        post_list,
+        request,
+        (Counter.AUTHOR, author.pk)
+    )
+    following = request.user.is_authenticated and Follow.objects.filter(
+        user=request.user,
+        author=author
+    ).exists()
     context = {
         'page_obj': page_obj,
         'author': author,
+        'following': following,
+        'feed_cache_key': feed_cache.fragment_key(
+            feed_cache.AUTHOR, author.pk, page_obj
+        ),
     }
     return render(request, 'posts/profile.html', context)
 
 
+@login_required
+def follow_index(request):
+    context = {
+        'page_obj': timeline.timeline_page(request.user.pk, request),
+    }
+    return render(request, 'posts/follow.html', context)
+
+
+@login_required
+def profile_follow(request, username):
+    author = get_object_or_404(User, username=username)
+    if author != request.user:
+        Follow.objects.get_or_create(user=request.user, author=author)
+    return redirect('posts:profile', username=username)
+
+
+@login_required
+def profile_unfollow(request, username):
+    author = get_object_or_404(User, username=username)
+    Follow.objects.filter(user=request.user, author=author).delete()
+    return redirect('posts:profile', username=username)
+
+
+def search(request):
+    query = request.GET.get('q', '').strip()
+    paginator = Paginator(SearchResults(query), settings.POST_PER_PAGE)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        'page_query': urlencode({'q': query}) + '&',
+    }
+    return render(request, 'posts/search.html', context)
+
+
+@conditional_page(post_state)
 def post_detail(request, post_id):
-    post = get_object_or_404(Post, pk=post_id)
+    post = get_object_or_404(
+        Post.objects.select_related('author', 'group'),
+        pk=post_id
+    )
+    comments = paginate_objects(
+        Comment.objects.for_post(post.pk),
+        request,
+        (Counter.COMMENTS, post.pk),
+        per_page=settings.COMMENTS_PER_PAGE,
+        key=('created', 'id')
+    )
     context = {
         'post': post,
+        'author_posts_count': Counter.objects.value(
+            Counter.AUTHOR,
+            post.author_id
+        ),
+        'comments': comments,
+        'form': CommentForm(),
     }
     return render(request, 'posts/post_detail.html', context)
 
 
 @login_required
+def add_comment(request, post_id):
+    post = get_object_or_404(Post.objects.only('id'), pk=post_id)
+    form = CommentForm(request.POST or None)
+    if form.is_valid():
+        comment = form.save(commit=False)
+        comment.author = request.user
+        comment.post = post
+        comment.save()
+    return redirect('posts:post_detail', post_id=post_id)
+
+
+@login_required
+@image_uploads
 def post_create(request, method='POST'):
     form = PostForm(request.POST or None)
+    image_form = PostImageForm(
+        request.POST or None,
+        files=request.FILES or None,
+        instance=form.instance
+    )
     if request.method == method:
-        if form.is_valid():
+        if form.is_valid() and image_form.is_valid():
             post = form.save(commit=False)
             post.author = request.user
             post.save()
             return redirect('posts:profile', username=post.author)
     context = {
         'form': form,
+        'image_form': image_form,
     }
     return render(request, 'posts/create_post.html', context)
 
 
 @login_required
+@image_uploads
 def post_edit(request, post_id: int):
     post = get_object_or_404(Post, pk=post_id)
-    form = PostForm(
+    form = PostForm(request.POST or None, instance=post)
+    image_form = PostImageForm(
         request.POST or None,
         files=request.FILES or None,
         instance=post
     )
     if request.user == post.author:
         if request.method == 'POST':
-            if form.is_valid():
+            if form.is_valid() and image_form.is_valid():
                 form.save()
                 return redirect('posts:post_detail', post_id=post_id)
     else:
@@ -79,5 +183,6 @@ def post_edit(request, post_id: int):
         'is_edit': True,
         'post': post,
         'form': form,
+        'image_form': image_form,
     }
     return render(request, 'posts/create_post.html', context)
@@ -1,5 +1,7 @@
 import os
 
+from django.core.exceptions import ImproperlyConfigured
+
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 
 
@@ -16,9 +18,10 @@ ALLOWED_HOSTS = [
 
 INSTALLED_APPS = [
     'about',
-    'posts',
+    'posts.apps.PostsConfig',
     'users',
     'core.apps.CoreConfig',
+    'api.apps.ApiConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
@@ -29,6 +32,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'core.middleware.RequestTimingMiddleware',
+    'core.middleware.QueryInspectionMiddleware',
+    'core.middleware.ReplicaRoutingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -48,8 +54,76 @@ DATABASES = {
     'default': {
         'ENGINE': 'django.db.backends.sqlite3',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        # Соединение живёт между запросами одного потока.
+        # У runserver поток на каждый запрос, там это не помогает.
+        'CONN_MAX_AGE': int(os.getenv('YATUBE_CONN_MAX_AGE', 600)),
+    }
+}
+
+# Реплики только для чтения: пути к копиям базы через запятую
+# в YATUBE_DB_REPLICAS. Копии обновляет команда sync_replica.
+DATABASE_REPLICAS = []
+for number, path in enumerate(
+    filter(None, os.getenv('YATUBE_DB_REPLICAS', '').split(',')), 1
+):
+    DATABASES[f'replica{number}'] = {
+        **DATABASES['default'],
+        'NAME': path,
+        'TEST': {'MIRROR': 'default'},
     }
+    DATABASE_REPLICAS.append(f'replica{number}')
+DATABASE_ROUTERS = ['core.routers.PrimaryReplicaRouter']
+# Сколько секунд после записи пользователь читает основную базу.
+REPLICA_STICKY_SECONDS = 10
+
+# Выставляются на каждом новом соединении, см. core/sqlite.py.
+SQLITE_PRAGMAS = {
+    'journal_mode': 'WAL',
+    # В WAL NORMAL не портит базу при сбое: теряются
+    # только последние транзакции при отключении питания.
+    'synchronous': 'NORMAL',
+    'busy_timeout': 5000,
+    'cache_size': -20000,
+    'mmap_size': 256 * 1024 * 1024,
+}
+
+# Кэш выбирается переменной окружения YATUBE_CACHE:
+# locmem — память процесса с вытеснением давно неиспользуемых записей,
+# file — общий для нескольких процессов каталог на диске,
+# dummy — без кэширования.
+CACHE_BACKENDS = {
+    'locmem': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'yatube',
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('YATUBE_CACHE_MAX_ENTRIES', 5000)),
+        },
+    },
+    'file': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.getenv(
+            'YATUBE_CACHE_LOCATION',
+            os.path.join(BASE_DIR, 'cache')
+        ),
+        'OPTIONS': {
+            'MAX_ENTRIES': int(os.getenv('YATUBE_CACHE_MAX_ENTRIES', 5000)),
+        },
+    },
+    'dummy': {
+        'BACKEND': 'django.core.cache.backends.dummy.DummyCache',
+    },
 }
+CACHE_BACKEND = os.getenv('YATUBE_CACHE', 'locmem')
+if CACHE_BACKEND not in CACHE_BACKENDS:
+    raise ImproperlyConfigured(
+        f'YATUBE_CACHE={CACHE_BACKEND!r}, допустимые значения: '
+        + ', '.join(CACHE_BACKENDS)
+    )
+CACHES = {
+    'default': CACHE_BACKENDS[CACHE_BACKEND],
+}
+
+SESSION_ENGINE = 'django.contrib.sessions.backends.cached_db'
 
 
 AUTH_PASSWORD_VALIDATORS = [
@@ -81,12 +155,28 @@ STATIC_URL = '/static/'
 STATICFILES_DIRS = (os.path.join(BASE_DIR, 'static'),)
 
 TEMPLATES_DIR = os.path.join(BASE_DIR, 'templates')
+# Скомпилированные шаблоны хранятся в памяти процесса и не читаются
+# с диска на каждый запрос. При DEBUG кэш выключен, чтобы правки
+# шаблонов были видны без перезапуска; YATUBE_TEMPLATE_CACHE=1
+# включает его и при DEBUG.
+TEMPLATE_CACHE = os.getenv(
+    'YATUBE_TEMPLATE_CACHE', '0' if DEBUG else '1'
+) == '1'
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+if TEMPLATE_CACHE:
+    TEMPLATE_LOADERS = [
+        ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+    ]
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'core.timing.TimedDjangoTemplates',
+        'NAME': 'django',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            'loaders': TEMPLATE_LOADERS,
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -106,7 +196,68 @@ EMAIL_FILE_PATH = os.path.join(BASE_DIR, 'sent_emails')
 
 POST_PER_PAGE = 10
 
+COMMENTS_PER_PAGE = 20
+
+# Посты авторов, у которых больше подписчиков, не копируются
+# в ленты подписок, а читаются при показе ленты.
+FOLLOW_FANOUT_LIMIT = 1000
+# Раскладка постов по лентам подписок идёт через очередь задач.
+# Без неё запрос ждёт записи до FOLLOW_FANOUT_LIMIT строк на пост.
+TIMELINE_ASYNC = True
+
+FEED_CACHE_TIMEOUT = 60 * 5
+
+# Сколько последних постов отдают ленты RSS, Atom и JSON Feed.
+SYNDICATION_ITEMS = 20
+
+# Размер страницы API по умолчанию и наибольший допустимый ?limit=.
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+
 MEDIA_URL = '/media/'
 MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
 
+# Миниатюры картинок постов, создаваемые после сохранения поста.
+POST_THUMBNAILS = {
+    'detail': {'geometry': '960x339', 'crop': 'center', 'upscale': True},
+}
+POST_THUMBNAILS_ASYNC = True
+
+# Фоновые задачи, см. core/tasks.py. Без YATUBE_TASKS_IN_PROCESS=0
+# очередь разбирает поток веб-процесса; на сервере лучше
+# отключить его и запустить отдельный run_tasks.
+TASK_QUEUE_IN_PROCESS = os.getenv('YATUBE_TASKS_IN_PROCESS', '1') == '1'
+TASK_BATCH_SIZE = 20
+TASK_POLL_SECONDS = 1.0
+# Задача, которая выполняется дольше, считается брошенной
+# и достаётся другому обработчику.
+TASK_LEASE_SECONDS = 300
+TASK_MAX_ATTEMPTS = 5
+# Пауза перед повтором: TASK_RETRY_DELAY * 2 ** (попытка - 1) секунд.
+TASK_RETRY_DELAY = 10
+
+# Картинки постов пишутся на диск кусками и отбрасываются, как только
+# превышают лимит размера файла или числа пикселей из заголовка,
+# см. posts.uploads.image_uploads. Картинки больше
+# POST_IMAGE_MAX_DIMENSION по большей стороне уменьшаются перед
+# сохранением.
+POST_IMAGE_MAX_UPLOAD_SIZE = 10 * 2 ** 20
+POST_IMAGE_MAX_PIXELS = 40_000_000
+POST_IMAGE_MAX_DIMENSION = 1920
+
+# Замеры времени ответов по представлениям: YATUBE_REQUEST_TIMING=1
+# включает их, сводка доступна персоналу на /admin/timing/.
+# REQUEST_TIMING_HEADER добавляет к ответам заголовок Server-Timing.
+REQUEST_TIMING = os.getenv('YATUBE_REQUEST_TIMING') == '1'
+REQUEST_TIMING_HEADER = DEBUG
+
+# Журнал медленных запросов (дольше SLOW_QUERY_MS) и поиск N+1:
+# запрос одной формы, повторённый в ответе QUERY_REPEAT_THRESHOLD раз,
+# попадает в журнал yatube.queries с местом в шаблоне и стеком.
+# QUERY_INSPECTION_RAISE превращает предупреждение в исключение.
+QUERY_INSPECTION = DEBUG
+QUERY_INSPECTION_RAISE = False
+QUERY_REPEAT_THRESHOLD = 5
+SLOW_QUERY_MS = 100
+
 CSRF_FAILURE_VIEW = 'core.views.csrf_failure'
@@ -3,14 +3,18 @@ from django.contrib import admin
 from django.conf import settings
 from django.conf.urls.static import static
 
+from core.views import timing_stats
+
 handler404 = 'core.views.page_not_found'
 
 urlpatterns = [
     path('', include('posts.urls', namespace='posts')),
+    path('admin/timing/', timing_stats, name='timing_stats'),
     path('admin/', admin.site.urls),
     path('auth/', include('users.urls')),
     path('auth/', include('django.contrib.auth.urls')),
     path('about/', include('about.urls', namespace='about')),
+    path('api/v1/', include('api.urls', namespace='api')),
 ]
 
 if settings.DEBUG: